@@ -179,6 +179,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['user__username', 'user__email', 'roll_number']
     ordering_fields = ['user__username', 'roll_number', 'created_at']
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         user = self.request.user
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_userprofile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['created_at', 'id'], name='profile_created_id_idx'),
+        ),
+    ]
@@ -19,6 +19,11 @@ class UserProfile(models.Model):
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='profile_created_id_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.user.username} ({self.role})"
 
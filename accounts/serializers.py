@@ -10,15 +10,30 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'profile']
 
+    def _media_host(self):
+        """``(protocol, host)`` for absolute avatar URLs, resolved once per serializer (not per row)."""
+        if not hasattr(self, '_media_host_cache'):
+            # Handle RENDER env vars for absolute URLs
+            render_host = os.environ.get('RENDER_EXTERNAL_HOSTNAME')
+            is_render = os.environ.get('RENDER') == 'true'
+            protocol = 'https' if is_render else 'http'
+            host = render_host if is_render and render_host else None
+
+            request = self.context.get('request')
+            if not host and request:
+                host = request.get_host()
+                protocol = 'https' if request.is_secure() else 'http'
+            if host:
+                # Clean host
+                host = host.replace('https://', '').replace('http://', '').strip('/')
+            self._media_host_cache = (protocol, host)
+        return self._media_host_cache
+
     def get_profile(self, obj):
         try:
             profile = obj.profile
             avatar_url = profile.avatar.url if profile.avatar else None
-            
-            # Handle RENDER env vars for absolute URLs
-            render_host = os.environ.get('RENDER_EXTERNAL_HOSTNAME')
-            is_render = os.environ.get('RENDER') == 'true'
-            
+
             # Definitive fix for media URLs
             if avatar_url:
                 # 1. Always extract the raw media path (e.g., /media/avatars/...)
@@ -26,19 +41,11 @@ class UserSerializer(serializers.ModelSerializer):
                     path = '/media/' + avatar_url.split('/media/')[-1]
                 else:
                     path = avatar_url
-                
+
                 # 2. Determine the correct base URL
-                protocol = 'https' if is_render else 'http'
-                host = render_host if is_render and render_host else None
-                
+                protocol, host = self._media_host()
                 request = self.context.get('request')
-                if not host and request:
-                    host = request.get_host()
-                    protocol = 'https' if request.is_secure() else 'http'
-                
                 if host:
-                    # Clean host
-                    host = host.replace('https://', '').replace('http://', '').strip('/')
                     avatar_url = f"{protocol}://{host}{path}"
                 elif request:
                     avatar_url = request.build_absolute_uri(path)
@@ -6,7 +6,8 @@ from django.utils import timezone
 from datetime import timedelta
 from accounts.models import UserProfile
 from books.models import Book
-from transactions.models import BookIssue, Fine
+from transactions.archive import merged_counts
+from transactions.models import BookIssue, BookIssueArchive, Fine
 from .models import AuditLog
 from .serializers import AuditLogSerializer
 from accounts.permissions import IsAdminOrOwner, IsOwner
@@ -45,6 +46,7 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all()
     serializer_class = AuditLogSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwner]
+    keyset_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
         # The permission class already ensures only owners can access this view
@@ -96,14 +98,18 @@ class DashboardViewSet(viewsets.ViewSet):
             overdue_books = BookIssue.objects.filter(status='ISSUED', due_date__lt=timezone.now().date()).count()
             total_fines = Fine.objects.aggregate(total=Sum('amount'))['total'] or 0
             collected_fines = Fine.objects.filter(paid=True).aggregate(total=Sum('amount'))['total'] or 0
+            accruing_fines = BookIssue.objects.filter(status='ISSUED').aggregate(total=Sum('fine_accrued'))['total'] or 0
             
             # Recent Activity (Last 5 issues/returns)
             recent_activity = BookIssue.objects.order_by('-updated_at')[:5].values(
                 'id', 'book__title', 'user__username', 'status', 'updated_at'
             )
 
-            # Top Books (Most Issued)
-            top_books = BookIssue.objects.values('book__title').annotate(count=Count('id')).order_by('-count')[:5]
+            # Top Books (Most Issued), including archived history
+            top_books = [
+                {'book__title': title, 'count': count}
+                for title, count in merged_counts('book__title', BookIssue.objects.all(), BookIssueArchive.objects.all()).most_common(5)
+            ]
 
             # Monthly Activity (Last 6 months)
             # SQLite doesn't support TruncMonth deeply, so we might need a simpler approach or raw SQL if strict
@@ -111,13 +117,20 @@ class DashboardViewSet(viewsets.ViewSet):
             # Using simple iteration for now to be safe with potential SQLite limitations in some environments
             # or try TruncMonth if we are sure. Let's use TruncMonth and generic view.
             from django.db.models.functions import TruncMonth
-            monthly_activity = BookIssue.objects.annotate(month=TruncMonth('issue_date')).values('month').annotate(count=Count('id')).order_by('-month')[:6]
+            monthly_counts = merged_counts(
+                'month',
+                BookIssue.objects.annotate(month=TruncMonth('issue_date')),
+                BookIssueArchive.objects.annotate(month=TruncMonth('issue_date')),
+            )
+            months = sorted(monthly_counts, key=lambda month: (month is not None, month), reverse=True)[:6]
+            monthly_activity = [{'month': month, 'count': monthly_counts[month]} for month in months]
 
             # Category Distribution (For Dashboard Pie Chart)
             category_distribution = Book.objects.values('category__name').annotate(count=Count('id')).order_by('-count')
 
             # Issue Status Distribution (For Dashboard Donut Chart)
-            status_distribution = BookIssue.objects.values('status').annotate(count=Count('id')).order_by('status')
+            status_counts = merged_counts('status', BookIssue.objects.all(), BookIssueArchive.objects.all())
+            status_distribution = [{'status': name, 'count': status_counts[name]} for name in sorted(status_counts)]
 
             # User Role Distribution
             admin_count = UserProfile.objects.filter(role=UserProfile.ROLE_ADMIN).count()
@@ -131,6 +144,7 @@ class DashboardViewSet(viewsets.ViewSet):
                 'overdue_count': overdue_books,
                 'total_fines': total_fines,
                 'collected_fines': collected_fines,
+                'accruing_fines': accruing_fines,
                 'recent_activity': list(recent_activity),
                 'top_books': list(top_books),
                 'monthly': list(monthly_activity),
@@ -150,6 +164,7 @@ class DashboardViewSet(viewsets.ViewSet):
             requested_count = my_issues.filter(status='REQUESTED').count()
             overdue_count = my_issues.filter(status='ISSUED', due_date__lt=timezone.now().date()).count()
             my_fines = Fine.objects.filter(issue__user=user, paid=False).aggregate(total=Sum('amount'))['total'] or 0
+            my_accruing = my_issues.filter(status='ISSUED').aggregate(total=Sum('fine_accrued'))['total'] or 0
             
             # Recent Activity
             recent_activity = my_issues.order_by('-updated_at')[:5].values(
@@ -158,7 +173,7 @@ class DashboardViewSet(viewsets.ViewSet):
 
             # Current Active Issues
             current_issues = my_issues.filter(status='ISSUED').values(
-                'id', 'book__title', 'book__author__name', 'issue_date', 'due_date'
+                'id', 'book__title', 'book__author__name', 'issue_date', 'due_date', 'fine_accrued'
             )
 
             data = {
@@ -166,6 +181,7 @@ class DashboardViewSet(viewsets.ViewSet):
                 'pending_requests': requested_count,
                 'overdue_count': overdue_count,
                 'fines_due': my_fines,
+                'fines_accruing': my_accruing,
                 'recent_activity': list(recent_activity),
                 'current_issues': list(current_issues)
             }
@@ -0,0 +1,90 @@
+import re
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from analytics.models import AuditLog
+from books.models import Book
+from fine_payments.models import FinePayment
+from notifications.models import Notification
+from reservations.models import Reservation
+from transactions.models import BookIssue, Fine
+
+# Plan lines that mean a whole table is read (SQLite, PostgreSQL, MySQL).
+FULL_SCAN_MARKERS = ('Seq Scan', 'type: ALL')
+SQLITE_SCAN_RE = re.compile(r'\bSCAN \w+')
+
+
+def hot_queries():
+    """``(label, queryset)`` for the filters behind the dashboard, reminders, queues and reports."""
+    today = date.today()
+    now = timezone.now()
+    user_id = User.objects.values_list('id', flat=True).first() or 0
+    book_id = Book.objects.values_list('id', flat=True).first() or 0
+    return [
+        ('Overdue issues (dashboard, reports, due_warnings)',
+         BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date__lt=today)),
+        ('Issues due today (due_warnings)',
+         BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date=today)),
+        ('Distinct overdue due dates (accrue_fines)',
+         BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date__lt=today)
+         .values('due_date').distinct().order_by()),
+        ("A user's open issues (student dashboard)",
+         BookIssue.objects.filter(user_id=user_id, status=BookIssue.STATUS_ISSUED)),
+        ("A book's reservation queue",
+         Reservation.objects.filter(book_id=book_id, status=Reservation.STATUS_QUEUED).order_by('created_at', 'id')),
+        ('Reservations past expiry (expire_reservations)',
+         Reservation.objects.filter(status__in=[Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED],
+                                    expires_at__lt=now)),
+        ('Unread notifications (counter repair)',
+         Notification.objects.filter(user_id=user_id, read_at__isnull=True).values('id').order_by()),
+        ('Logins in a day (system activity)',
+         AuditLog.objects.filter(timestamp__range=(now - timedelta(days=1), now), action='LOGIN').values('id')),
+        ('Collected fines (dashboard)',
+         Fine.objects.filter(paid=True).values('amount')),
+        ('Pending payments, newest first',
+         FinePayment.objects.filter(status=FinePayment.STATUS_PENDING).order_by('-created_at')),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Print the query plans of the hot circulation/notification queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run the queries and report actual timings (PostgreSQL only)')
+        parser.add_argument('--only', help='Only queries whose label contains this text')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--analyze is only supported on PostgreSQL')
+            explain_options = {'analyze': True, 'buffers': True}
+
+        full_scans = []
+        for label, queryset in hot_queries():
+            if options['only'] and options['only'].lower() not in label.lower():
+                continue
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan + '\n')
+            if self._is_full_scan(plan):
+                full_scans.append(label)
+
+        if full_scans:
+            self.stdout.write(self.style.WARNING(
+                'Full table scans (expected only on small tables): ' + '; '.join(full_scans)))
+        else:
+            self.stdout.write(self.style.SUCCESS('Every query uses an index'))
+
+    @staticmethod
+    def _is_full_scan(plan):
+        if any(marker in plan for marker in FULL_SCAN_MARKERS):
+            return True
+        # SQLite: "SCAN <table>" without an index; "SCAN ... USING INDEX" is fine.
+        return any(SQLITE_SCAN_RE.search(line) and 'INDEX' not in line for line in plan.splitlines())
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from analytics.projections import catch_up, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Apply new circulation events to the derived loan/book/user tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute the tables from the whole event log')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            applied = rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt projections from {applied} events'))
+        else:
+            applied = catch_up()
+            self.stdout.write(self.style.SUCCESS(f'Applied {applied} new events'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_auditlog_auditlog_timestamp_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp', 'action'], name='auditlog_timestamp_action_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_checkpoint(apps, schema_editor):
+    ProjectionCheckpoint = apps.get_model('analytics', 'ProjectionCheckpoint')
+    ProjectionCheckpoint.objects.get_or_create(name='circulation')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_catalogversion'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0003_auditlog_auditlog_timestamp_action_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookCirculationStats',
+            fields=[
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('issues', models.PositiveIntegerField(default=0)),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('rejections', models.PositiveIntegerField(default=0)),
+                ('extensions', models.PositiveIntegerField(default=0)),
+                ('active_loans', models.IntegerField(default=0)),
+                ('book', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='books.book')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserCirculationStats',
+            fields=[
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('issues', models.PositiveIntegerField(default=0)),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('rejections', models.PositiveIntegerField(default=0)),
+                ('extensions', models.PositiveIntegerField(default=0)),
+                ('active_loans', models.IntegerField(default=0)),
+                ('user', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('fines_total', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('fines_paid', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CurrentLoan',
+            fields=[
+                ('issue_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('issue_date', models.DateField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('book', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='books.book')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['due_date'], name='currentloan_due_idx')],
+            },
+        ),
+        migrations.RunPython(seed_checkpoint, migrations.RunPython.noop),
+    ]
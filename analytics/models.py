@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from books.models import Book
+
 class AuditLog(models.Model):
     ACTION_CHOICES = [
         ('LOGIN', 'User Login'),
@@ -22,6 +24,70 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='auditlog_timestamp_id_idx'),
+            models.Index(fields=['timestamp', 'action'], name='auditlog_timestamp_action_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.action} - {self.timestamp}"
+
+
+# Projections of the circulation event log (see analytics.projections). They are
+# derived data: ids are not constrained, and every table can be rebuilt from the log.
+
+class ProjectionCheckpoint(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
+
+
+class CurrentLoan(models.Model):
+    issue_id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    book = models.ForeignKey(Book, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    issue_date = models.DateField(blank=True, null=True)
+    due_date = models.DateField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['due_date'], name='currentloan_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Loan {self.issue_id} due {self.due_date}"
+
+
+class CirculationCounters(models.Model):
+    requests = models.PositiveIntegerField(default=0)
+    issues = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    rejections = models.PositiveIntegerField(default=0)
+    extensions = models.PositiveIntegerField(default=0)
+    active_loans = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class BookCirculationStats(CirculationCounters):
+    book = models.OneToOneField(
+        Book, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name='+'
+    )
+
+    def __str__(self):
+        return f"Circulation of book {self.book_id}"
+
+
+class UserCirculationStats(CirculationCounters):
+    user = models.OneToOneField(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name='+'
+    )
+    fines_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    fines_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"Circulation of user {self.user_id}"
@@ -0,0 +1,193 @@
+"""Derived circulation tables built from the ``CirculationEvent`` log.
+
+``CurrentLoan`` (issued and not yet returned), ``BookCirculationStats`` and
+``UserCirculationStats`` are projections of the log. ``catch_up`` applies the
+events recorded since the checkpoint. It runs after every commit that records
+events, and from the ``project_circulation`` command. ``rebuild`` recomputes
+every table from the whole log in a single streaming pass.
+
+Ids are assigned at insert time but transactions commit in any order, so a
+lower id can become visible after a higher one. Both stop at a gap in the ids
+until the gap is older than ``GAP_TIMEOUT``, after which it is taken to be a
+rolled-back insert and skipped.
+"""
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from transactions.models import CirculationEvent
+
+from .models import BookCirculationStats, CurrentLoan, ProjectionCheckpoint, UserCirculationStats
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT = 'circulation'
+CATCH_UP_BATCH_SIZE = 1000
+WRITE_BATCH_SIZE = 5000
+GAP_TIMEOUT = timedelta(seconds=60)
+COUNTERS = ('requests', 'issues', 'returns', 'rejections', 'extensions', 'active_loans')
+LOAN_FIELDS = ('user_id', 'book_id', 'issue_date', 'due_date')
+
+
+def _date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _amount(value):
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+
+class ProjectionState:
+    """The projection rows touched by a run of events, updated in memory."""
+
+    def __init__(self):
+        self.loans = {}             # issue_id -> LOAN_FIELDS values
+        self.closed_loans = set()   # issue ids returned in this run
+        self.books = {}             # book_id -> counters
+        self.users = {}             # user_id -> counters and fine totals
+
+    @classmethod
+    def load(cls, events):
+        """State holding the stored rows that ``events`` will change."""
+        state = cls()
+        issue_ids = {event.issue_id for event in events if event.issue_id is not None}
+        book_ids = {event.book_id for event in events if event.book_id is not None}
+        user_ids = {event.user_id for event in events if event.user_id is not None}
+        for row in CurrentLoan.objects.filter(issue_id__in=issue_ids).values('issue_id', *LOAN_FIELDS):
+            state.loans[row.pop('issue_id')] = row
+        for row in BookCirculationStats.objects.filter(book_id__in=book_ids).values('book_id', *COUNTERS):
+            state.books[row.pop('book_id')] = row
+        user_fields = ('user_id', *COUNTERS, 'fines_total', 'fines_paid')
+        for row in UserCirculationStats.objects.filter(user_id__in=user_ids).values(*user_fields):
+            state.users[row.pop('user_id')] = row
+        return state
+
+    def book(self, book_id):
+        return self.books.setdefault(book_id, dict.fromkeys(COUNTERS, 0))
+
+    def user(self, user_id):
+        if user_id not in self.users:
+            self.users[user_id] = {**dict.fromkeys(COUNTERS, 0), 'fines_total': Decimal('0'), 'fines_paid': Decimal('0')}
+        return self.users[user_id]
+
+    def _count(self, event, counter, step=1):
+        if event.book_id is not None:
+            self.book(event.book_id)[counter] += step
+        if event.user_id is not None:
+            self.user(event.user_id)[counter] += step
+
+    def apply(self, event):
+        kind, data = event.kind, event.data
+        if kind == CirculationEvent.KIND_REQUESTED:
+            self._count(event, 'requests')
+        elif kind == CirculationEvent.KIND_ISSUED:
+            self._count(event, 'issues')
+            self._count(event, 'active_loans')
+            self.loans[event.issue_id] = {
+                'user_id': event.user_id, 'book_id': event.book_id,
+                'issue_date': _date(data.get('issue_date')), 'due_date': _date(data.get('due_date')),
+            }
+            self.closed_loans.discard(event.issue_id)
+        elif kind == CirculationEvent.KIND_REJECTED:
+            self._count(event, 'rejections')
+        elif kind == CirculationEvent.KIND_RETURNED:
+            self._count(event, 'returns')
+            self._count(event, 'active_loans', -1)
+            self.loans.pop(event.issue_id, None)
+            self.closed_loans.add(event.issue_id)
+        elif kind == CirculationEvent.KIND_EXTENDED:
+            self._count(event, 'extensions')
+            if event.issue_id in self.loans:
+                self.loans[event.issue_id]['due_date'] = _date(data.get('due_date'))
+        elif kind == CirculationEvent.KIND_FINED and event.user_id is not None:
+            self.user(event.user_id)['fines_total'] += _amount(data.get('amount')) - _amount(data.get('previous'))
+        elif kind == CirculationEvent.KIND_PAID and event.user_id is not None:
+            self.user(event.user_id)['fines_paid'] += _amount(data.get('amount'))
+
+    def save(self, replace=False):
+        """Write the state back; ``replace=True`` swaps out the whole tables."""
+        if replace:
+            CurrentLoan.objects.all().delete()
+            BookCirculationStats.objects.all().delete()
+            UserCirculationStats.objects.all().delete()
+        else:
+            CurrentLoan.objects.filter(issue_id__in=self.closed_loans).delete()
+        _write(CurrentLoan, [CurrentLoan(issue_id=issue_id, **loan) for issue_id, loan in self.loans.items()],
+               'issue_id', LOAN_FIELDS, upsert=not replace)
+        _write(BookCirculationStats,
+               [BookCirculationStats(book_id=book_id, **counters) for book_id, counters in self.books.items()],
+               'book', COUNTERS, upsert=not replace)
+        _write(UserCirculationStats,
+               [UserCirculationStats(user_id=user_id, **counters) for user_id, counters in self.users.items()],
+               'user', (*COUNTERS, 'fines_total', 'fines_paid'), upsert=not replace)
+
+
+def _write(model, objects, key, fields, upsert):
+    options = {'update_conflicts': True, 'unique_fields': [key], 'update_fields': list(fields)} if upsert else {}
+    model.objects.bulk_create(objects, batch_size=WRITE_BATCH_SIZE, **options)
+
+
+def _ready(events, last_event_id):
+    """Events in id order up to the first gap that may still be filled by an open transaction."""
+    cutoff = timezone.now() - GAP_TIMEOUT
+    expected = last_event_id + 1
+    for event in events:
+        if event.id != expected and event.created_at > cutoff:
+            return
+        yield event
+        expected = event.id + 1
+
+
+def _lock_checkpoint(wait=True):
+    ProjectionCheckpoint.objects.get_or_create(name=CHECKPOINT)
+    return ProjectionCheckpoint.objects.select_for_update(skip_locked=not wait).filter(name=CHECKPOINT).first()
+
+
+def catch_up(batch_size=CATCH_UP_BATCH_SIZE, wait=True):
+    """Apply the events recorded since the checkpoint. Returns the number applied.
+
+    With ``wait=False`` it returns at once if another process is projecting.
+    """
+    applied = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = _lock_checkpoint(wait)
+            if checkpoint is None:
+                return applied
+            pending = CirculationEvent.objects.filter(id__gt=checkpoint.last_event_id).order_by('id')[:batch_size]
+            events = list(_ready(pending, checkpoint.last_event_id))
+            if not events:
+                return applied
+            state = ProjectionState.load(events)
+            for event in events:
+                state.apply(event)
+            state.save()
+            checkpoint.last_event_id = events[-1].id
+            checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+        applied += len(events)
+
+
+def rebuild():
+    """Recompute every projection from the whole log in one streaming pass. Returns the events applied."""
+    with transaction.atomic():
+        checkpoint = _lock_checkpoint()
+        state = ProjectionState()
+        applied, last_event_id = 0, 0
+        for event in _ready(CirculationEvent.objects.order_by('id').iterator(chunk_size=WRITE_BATCH_SIZE), 0):
+            state.apply(event)
+            applied, last_event_id = applied + 1, event.id
+        state.save(replace=True)
+        checkpoint.last_event_id = last_event_id
+        checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+    return applied
+
+
+def catch_up_quietly():
+    """``catch_up`` for on-commit hooks: never blocks and never fails the request."""
+    try:
+        catch_up(wait=False)
+    except DatabaseError:
+        logger.exception('Circulation projection catch-up failed; run project_circulation')
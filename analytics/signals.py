@@ -0,0 +1,12 @@
+from django.dispatch import receiver
+
+from library_management_system.db import on_commit_once
+from transactions.signals import circulation_event_recorded
+
+from .projections import catch_up_quietly
+
+
+@receiver(circulation_event_recorded)
+def project_after_commit(sender, event, **kwargs):
+    # One catch-up per transaction, however many events it recorded (bulk returns).
+    on_commit_once('circulation_projection', catch_up_quietly)
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from transactions.events import record_event
+from transactions.models import CirculationEvent
+
+from .models import BookCirculationStats, CurrentLoan, UserCirculationStats
+from .projections import GAP_TIMEOUT, _ready, catch_up, rebuild
+
+
+def _snapshot():
+    return (
+        sorted(CurrentLoan.objects.values_list('issue_id', 'user_id', 'book_id', 'issue_date', 'due_date')),
+        sorted(BookCirculationStats.objects.values_list(
+            'book_id', 'requests', 'issues', 'returns', 'rejections', 'extensions', 'active_loans')),
+        sorted(UserCirculationStats.objects.values_list(
+            'user_id', 'requests', 'issues', 'returns', 'rejections', 'extensions', 'active_loans',
+            'fines_total', 'fines_paid')),
+    )
+
+
+class CatchUpTests(TestCase):
+    def record(self, kind, issue_id, user_id=1, book_id=10, **data):
+        return CirculationEvent.objects.create(kind=kind, issue_id=issue_id, user_id=user_id, book_id=book_id,
+                                               data=data)
+
+    def test_catch_up_matches_rebuild(self):
+        today = date.today()
+        self.record(CirculationEvent.KIND_REQUESTED, 1)
+        self.record(CirculationEvent.KIND_ISSUED, 1, issue_date=today, due_date=today + timedelta(days=14))
+        self.record(CirculationEvent.KIND_REQUESTED, 2, user_id=2)
+        self.record(CirculationEvent.KIND_REJECTED, 2, user_id=2)
+        self.assertEqual(catch_up(batch_size=3), 4)
+
+        self.record(CirculationEvent.KIND_REQUESTED, 3, user_id=2, book_id=11)
+        self.record(CirculationEvent.KIND_ISSUED, 3, user_id=2, book_id=11,
+                    issue_date=today, due_date=today + timedelta(days=7))
+        self.record(CirculationEvent.KIND_EXTENDED, 1, due_date=today + timedelta(days=21))
+        self.record(CirculationEvent.KIND_RETURNED, 1, return_date=today)
+        self.record(CirculationEvent.KIND_FINED, 1, amount='2.50', previous=None)
+        self.record(CirculationEvent.KIND_FINED, 1, amount='4.00', previous='2.50')
+        self.record(CirculationEvent.KIND_PAID, 1, amount='4.00')
+        self.assertEqual(catch_up(), 7)
+        self.assertEqual(catch_up(), 0)
+
+        incremental = _snapshot()
+        self.assertEqual(incremental[0], [(3, 2, 11, today, today + timedelta(days=7))])
+        self.assertEqual(rebuild(), 11)
+        self.assertEqual(_snapshot(), incremental)
+
+    def test_one_catch_up_per_transaction(self):
+        with mock.patch('analytics.signals.catch_up_quietly') as catch_up_quietly:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for book_id in range(1, 6):
+                        record_event(CirculationEvent.KIND_RETURNED, user_id=1, book_id=book_id)
+        catch_up_quietly.assert_called_once_with()
+
+
+class ReadyTests(TestCase):
+    def events(self, *specs):
+        return [SimpleNamespace(id=pk, created_at=created_at) for pk, created_at in specs]
+
+    def test_stops_at_fresh_gap(self):
+        now = timezone.now()
+        events = self.events((1, now), (2, now), (4, now), (5, now))
+        self.assertEqual([event.id for event in _ready(events, 0)], [1, 2])
+
+    def test_stops_before_first_event_after_fresh_gap_at_checkpoint(self):
+        now = timezone.now()
+        self.assertEqual(list(_ready(self.events((7, now)), 5)), [])
+
+    def test_skips_gap_older_than_timeout(self):
+        now = timezone.now()
+        old = now - GAP_TIMEOUT - timedelta(seconds=1)
+        events = self.events((1, old), (3, old), (4, now))
+        self.assertEqual([event.id for event in _ready(events, 0)], [1, 3, 4])
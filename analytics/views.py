@@ -5,7 +5,8 @@ from django.shortcuts import render
 from accounts.decorators import role_required
 from accounts.models import UserProfile
 from books.models import Book
-from transactions.models import BookIssue, Fine
+from transactions.archive import merged_counts
+from transactions.models import BookIssue, BookIssueArchive, Fine
 
 
 @login_required
@@ -17,12 +18,11 @@ def dashboard(request):
         .annotate(count=Count('id'))
         .order_by('-count')[:5]
     )
-    monthly = (
-        BookIssue.objects.extra(select={'month': "date_trunc('month', created_at)"})
-        .values('month')
-        .annotate(count=Count('id'))
-        .order_by('month')
+    month = {'month': "date_trunc('month', created_at)"}
+    monthly_counts = merged_counts(
+        'month', BookIssue.objects.extra(select=month), BookIssueArchive.objects.extra(select=month)
     )
+    monthly = [{'month': key, 'count': monthly_counts[key]} for key in sorted(monthly_counts)]
     active_users = UserProfile.objects.filter(role=UserProfile.ROLE_STUDENT).count()
     fines = Fine.objects.aggregate(total=Sum('amount'))['total'] or 0
 
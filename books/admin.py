@@ -16,6 +16,6 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
-    list_display = ('title', 'isbn', 'author', 'category', 'quantity', 'available_count')
+    list_display = ('title', 'isbn', 'author', 'category', 'quantity', 'available_count', 'avg_rating', 'rating_count')
     list_filter = ('category', 'author')
     search_fields = ('title', 'isbn', 'author__name')
@@ -1,38 +1,174 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from . import autocomplete
+from .bulk import MAX_BULK_ITEMS, bulk_upsert_books
+from .caching import AUTHOR, BOOK, CATEGORY, ConditionalGetMixin
+from .facets import DEFAULT_AUTHOR_LIMIT, cached_facets
+from .filters import FullTextSearchFilter
 from .models import Author, Category, Book
-from .serializers import AuthorSerializer, CategorySerializer, BookSerializer
+from .serializers import (
+    AuthorSerializer, CategorySerializer, BookSerializer, query_param_list, side_load_relations, wants_compact
+)
 from accounts.api_views import CsrfExemptSessionAuthentication
+from accounts.permissions import IsAdminOrOwner
+from recommendations.serializers import CoBorrowSerializer
+from recommendations import content as content_similarity
+from recommendations.utils import also_borrowed
 
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 @method_decorator(csrf_exempt, name='dispatch')
-class AuthorViewSet(viewsets.ModelViewSet):
+class AuthorViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Author.objects.all()
+    catalog_tables = (AUTHOR,)
     serializer_class = AuthorSerializer
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
+    catalog_tables = (CATEGORY,)
     serializer_class = CategorySerializer
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 @method_decorator(csrf_exempt, name='dispatch')
-class BookViewSet(viewsets.ModelViewSet):
-    queryset = Book.objects.all()
+class BookViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Book.objects.select_related('author', 'category')
+    catalog_tables = (BOOK, AUTHOR, CATEGORY)
+    object_tables = (AUTHOR, CATEGORY)
     serializer_class = BookSerializer
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'isbn', 'author__name']
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    ordering_fields = ['title', 'avg_rating', 'rating_count', 'published_year', 'created_at']
+    keyset_ordering = ('title', 'id')
+    facet_params = ('search', 'min_rating', 'category', 'author', 'decade', 'available')
     
-    from rest_framework.pagination import PageNumberPagination
-    class StandardResultsSetPagination(PageNumberPagination):
+    from library_management_system.pagination import HybridPagination
+    class StandardResultsSetPagination(HybridPagination):
         page_size = 10
         page_size_query_param = 'page_size'
         max_page_size = 1000
 
     pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and wants_compact(self.request):
+            # Relations are side-loaded once per page instead of joined per row.
+            expand = set(query_param_list(self.request, 'expand'))
+            queryset = queryset.select_related(None).select_related(*expand.intersection(BookSerializer.compact_relations))
+        params = self.request.query_params
+        min_rating = params.get('min_rating')
+        if min_rating:
+            try:
+                queryset = queryset.filter(avg_rating__gte=float(min_rating))
+            except ValueError:
+                pass
+        category = params.get('category')
+        if category == 'none':
+            queryset = queryset.filter(category__isnull=True)
+        elif category and category.isdigit():
+            queryset = queryset.filter(category_id=int(category))
+        author = params.get('author')
+        if author and author.isdigit():
+            queryset = queryset.filter(author_id=int(author))
+        decade = params.get('decade')
+        if decade and decade.isdigit():
+            queryset = queryset.filter(published_year__gte=int(decade), published_year__lt=int(decade) + 10)
+        available = params.get('available', '').lower()
+        if available in ('1', 'true', 'yes'):
+            queryset = queryset.filter(available_count__gt=0)
+        elif available in ('0', 'false', 'no'):
+            queryset = queryset.filter(available_count=0)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not wants_compact(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        books = page if page is not None else list(queryset)
+        data = self.get_serializer(books, many=True).data
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response({'results': data})
+        expand = set(query_param_list(request, 'expand'))
+        response.data.update(side_load_relations(books, exclude=expand))
+        return response
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Counts per category, author, decade and availability for the current search/filters."""
+        return self._conditional(request, None, self._facets)
+
+    def _facets(self, request):
+        try:
+            author_limit = min(int(request.query_params.get('author_limit', DEFAULT_AUTHOR_LIMIT)), 200)
+        except ValueError:
+            author_limit = DEFAULT_AUTHOR_LIMIT
+        params = {name: request.query_params.get(name, '') for name in self.facet_params}
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(cached_facets(queryset, params, author_limit))
+
+    @action(detail=True, methods=['get'])
+    def also_borrowed(self, request, pk=None):
+        """Books most often borrowed by readers of this one."""
+        book = self.get_object()
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            limit = 10
+        return Response({'results': CoBorrowSerializer(also_borrowed(book.pk, limit), many=True).data})
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Books with similar title/author/category/description text; works without borrow history."""
+        book = self.get_object()
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            limit = 10
+        # A few extra candidates cover books deleted since the index was built.
+        scores = dict(content_similarity.index.similar(book.pk, limit + 5))
+        books = Book.objects.select_related('author', 'category').in_bulk(scores)
+        ranked = sorted(books.values(), key=lambda other: -scores[other.pk])[:limit]
+        return Response({'results': [
+            {'book': data, 'score': scores[other.pk]}
+            for other, data in zip(ranked, BookSerializer(ranked, many=True).data)
+        ]})
+
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def suggest(self, request):
+        """Typeahead suggestions (books and authors) from the in-process prefix index."""
+        try:
+            limit = min(int(request.query_params.get('limit', autocomplete.DEFAULT_LIMIT)), autocomplete.MAX_LIMIT)
+        except ValueError:
+            limit = autocomplete.DEFAULT_LIMIT
+        return Response({'results': autocomplete.index.suggest(request.query_params.get('q', ''), limit)})
+
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[IsAdminOrOwner])
+    def bulk(self, request):
+        """Create or update many books keyed by ISBN, all or nothing."""
+        items = request.data.get('books') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Expected a non-empty list of books'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BULK_ITEMS:
+            return Response({'detail': f'At most {MAX_BULK_ITEMS} books per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        ok, results = bulk_upsert_books(items)
+        if not ok:
+            return Response({'detail': 'No changes were applied', 'results': results},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'updated': sum(1 for result in results if result['status'] == 'updated'),
+            'results': results,
+        })
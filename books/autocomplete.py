@@ -0,0 +1,165 @@
+"""In-process prefix index for search-box suggestions.
+
+Titles and author names are indexed from every word onwards (so "rings"
+finds "The Lord of the Rings") and ISBNs as a whole, in one sorted list that
+is searched with ``bisect``. The index is built on first use and kept current
+in this process by the Book/Author signals. Another process changing a title,
+ISBN or author name bumps the ``SUGGEST`` catalog version; a background thread
+checks it at most every ``REFRESH_INTERVAL`` seconds and rebuilds, while
+lookups keep using the previous index. Only the first lookup waits for the
+database.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.db import connections
+
+from .caching import SUGGEST, catalog_versions
+from .models import Author, Book
+
+REFRESH_INTERVAL = 30
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    return ' '.join(_WORD_RE.findall((text or '').lower()))
+
+
+def _keys(text):
+    """The normalized text starting at each of its words."""
+    words = normalize(text).split(' ')
+    return [' '.join(words[start:]) for start in range(len(words)) if words[start]]
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._entries = []   # sorted (key, kind, id)
+        self._labels = {}    # (kind, id) -> label
+        self._keys = {}      # (kind, id) -> index keys, for removal
+        self._built = False
+        self._version = None
+        self._checked = 0.0
+        self._refreshing = False
+
+    # Building -----------------------------------------------------------
+
+    @staticmethod
+    def _keys_for(label, isbn=None):
+        keys = _keys(label)
+        if isbn:
+            keys.append(normalize(isbn).replace(' ', ''))
+        return keys
+
+    @staticmethod
+    def _current_version():
+        return catalog_versions((SUGGEST,)).get(SUGGEST, (0,))[0]
+
+    def build(self):
+        version = self._current_version()
+        entries, labels, keys = [], {}, {}
+        rows = [('book', pk, title, isbn) for pk, title, isbn in
+                Book.objects.values_list('id', 'title', 'isbn').iterator(chunk_size=5000)]
+        rows += [('author', pk, name, None) for pk, name in
+                 Author.objects.values_list('id', 'name').iterator(chunk_size=5000)]
+        for kind, pk, label, isbn in rows:
+            labels[kind, pk] = label
+            keys[kind, pk] = self._keys_for(label, isbn)
+            entries += [(key, kind, pk) for key in keys[kind, pk]]
+        entries.sort()
+        with self._lock:
+            self._entries, self._labels, self._keys = entries, labels, keys
+            self._version, self._checked, self._built = version, time.monotonic(), True
+
+    def ensure_current(self):
+        if self._built:
+            if time.monotonic() - self._checked >= REFRESH_INTERVAL and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name='autocomplete-refresh', daemon=True).start()
+            return
+        with self._build_lock:
+            if not self._built:
+                self.build()
+
+    def _refresh(self):
+        try:
+            with self._build_lock:
+                self._checked = time.monotonic()
+                if self._current_version() != self._version:
+                    self.build()
+        finally:
+            self._refreshing = False
+            connections.close_all()
+
+    def _applied(self):
+        # The signals bump SUGGEST before this process's change reaches the index; if
+        # nothing else has bumped it since, the index is current at the new version.
+        version = self._current_version()
+        if self._version is not None and version <= self._version + 1:
+            self._version = max(version, self._version)
+
+    # Incremental updates (from signals) ---------------------------------
+
+    def _remove(self, kind, pk):
+        self._labels.pop((kind, pk), None)
+        for key in self._keys.pop((kind, pk), ()):
+            position = bisect_left(self._entries, (key, kind, pk))
+            if position < len(self._entries) and self._entries[position] == (key, kind, pk):
+                del self._entries[position]
+
+    def update(self, kind, pk, label, isbn=None):
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(kind, pk)
+            self._labels[kind, pk] = label
+            self._keys[kind, pk] = self._keys_for(label, isbn)
+            for key in self._keys[kind, pk]:
+                insort(self._entries, (key, kind, pk))
+        self._applied()
+
+    def remove(self, kind, pk):
+        if not self._built:
+            return
+        with self._lock:
+            self._remove(kind, pk)
+        self._applied()
+
+    # Lookup -------------------------------------------------------------
+
+    def suggest(self, text, limit=DEFAULT_LIMIT):
+        """Up to ``limit`` suggestions whose title, name or ISBN has a word starting with ``text``.
+
+        Matches at the start of the text come before matches on later words.
+        """
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        self.ensure_current()
+        leading, inner, seen = [], [], set()
+        # ISBNs are indexed without separators, so "978-0" also looks for "9780".
+        prefixes = [prefix] + ([prefix.replace(' ', '')] if ' ' in prefix else [])
+        with self._lock:
+            for candidate in prefixes:
+                position = bisect_left(self._entries, (candidate,))
+                end = min(position + limit * 20, len(self._entries))
+                while position < end and len(leading) < limit:
+                    key, kind, pk = self._entries[position]
+                    position += 1
+                    if not key.startswith(candidate):
+                        break
+                    if (kind, pk) in seen:
+                        continue
+                    seen.add((kind, pk))
+                    suggestion = {'type': kind, 'id': pk, 'label': self._labels[kind, pk]}
+                    (leading if self._keys[kind, pk][0].startswith(prefix) else inner).append(suggestion)
+        return (leading + inner)[:limit]
+
+
+index = PrefixIndex()
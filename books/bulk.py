@@ -0,0 +1,130 @@
+"""Batch create/update of books keyed by ISBN.
+
+All items are validated together against one pre-fetch of the referenced
+authors, categories and existing books, then applied in a single transaction
+with ``bulk_create``/``bulk_update``. If any item is invalid nothing is written.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import search
+from .caching import BOOK, SUGGEST, bump_catalog_version
+from .models import Author, Book, Category
+from .serializers import BookBulkItemSerializer
+
+MAX_BULK_ITEMS = 5000
+
+# Fields an item may set, in the order they are applied.
+BULK_FIELDS = ('title', 'author_id', 'category_id', 'quantity', 'available_count', 'description', 'published_year')
+
+
+def bulk_upsert_books(items):
+    """Validate and apply a list of book upserts.
+
+    Returns ``(ok, results)`` where ``results`` holds one entry per item, in
+    request order, with its ``status``: ``created``/``updated`` on success, or
+    ``invalid``/``valid`` when the batch was rejected.
+    """
+    results = []
+    valid = {}
+    for index, item in enumerate(items):
+        serializer = BookBulkItemSerializer(data=item)
+        if not serializer.is_valid():
+            results.append({'index': index, 'isbn': item.get('isbn') if isinstance(item, dict) else None,
+                            'status': 'invalid', 'errors': serializer.errors})
+            continue
+        data = serializer.validated_data
+        if data['isbn'] in valid:
+            results.append({'index': index, 'isbn': data['isbn'], 'status': 'invalid',
+                            'errors': {'isbn': ['Duplicate ISBN in this request.']}})
+            continue
+        valid[data['isbn']] = data
+        results.append({'index': index, 'isbn': data['isbn']})
+
+    with transaction.atomic():
+        author_ids = set(Author.objects.filter(
+            id__in={data['author_id'] for data in valid.values() if 'author_id' in data}
+        ).values_list('id', flat=True))
+        category_ids = set(Category.objects.filter(
+            id__in={data['category_id'] for data in valid.values() if data.get('category_id')}
+        ).values_list('id', flat=True))
+        existing = {book.isbn: book for book in Book.objects.select_for_update().filter(isbn__in=valid)}
+
+        to_create, to_update, update_fields = [], [], set()
+        for result in results:
+            if 'status' in result:
+                continue
+            data = valid[result['isbn']]
+            errors = _reference_errors(data, existing.get(data['isbn']), author_ids, category_ids)
+            if errors:
+                result.update(status='invalid', errors=errors)
+                continue
+            book = existing.get(data['isbn'])
+            if book is None:
+                book = Book(isbn=data['isbn'])
+                to_create.append(book)
+                result['status'] = 'created'
+            else:
+                to_update.append(book)
+                update_fields.update(name for name in BULK_FIELDS if name in data)
+                result['status'] = 'updated'
+            _apply(book, data)
+            result['book'] = book
+
+        if any(result['status'] == 'invalid' for result in results):
+            for result in results:
+                if result.pop('book', None) is not None:
+                    result['status'] = 'valid'
+            return False, results
+
+        now = timezone.now()
+        if to_create:
+            Book.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            if 'quantity' in update_fields:
+                update_fields.add('available_count')
+            for book in to_update:
+                book.updated_at = now
+            Book.objects.bulk_update(to_update, sorted(update_fields) + ['updated_at'], batch_size=500)
+
+        # Not every backend returns primary keys from bulk inserts.
+        missing = [book for book in to_create if book.pk is None]
+        if missing:
+            ids = dict(Book.objects.filter(isbn__in=[book.isbn for book in missing]).values_list('isbn', 'id'))
+            for book in missing:
+                book.pk = ids[book.isbn]
+        search.index_books([book.pk for book in to_create + to_update])
+        bump_catalog_version(BOOK)
+        if to_create or 'title' in update_fields:
+            bump_catalog_version(SUGGEST)
+
+    for result in results:
+        result['id'] = result.pop('book').pk
+    return True, results
+
+
+def _reference_errors(data, book, author_ids, category_ids):
+    errors = {}
+    if book is None:
+        for name in ('title', 'author_id'):
+            if name not in data:
+                errors[name] = ['This field is required when creating a book.']
+    if 'author_id' in data and data['author_id'] not in author_ids:
+        errors['author_id'] = [f'Invalid pk "{data["author_id"]}" - object does not exist.']
+    if data.get('category_id') and data['category_id'] not in category_ids:
+        errors['category_id'] = [f'Invalid pk "{data["category_id"]}" - object does not exist.']
+    return errors
+
+
+def _apply(book, data):
+    # Without an explicit available_count, a quantity change keeps the copies on loan.
+    if 'quantity' in data and 'available_count' not in data and book.pk is not None:
+        on_loan = max(book.quantity - book.available_count, 0)
+        book.available_count = max(data['quantity'] - on_loan, 0)
+    for name in BULK_FIELDS:
+        if name in data:
+            setattr(book, name, data[name])
+    if book.pk is None and 'available_count' not in data:
+        book.available_count = book.quantity
+    # bulk_create/bulk_update bypass Book.save(), which normally clamps this.
+    book.available_count = min(book.available_count, book.quantity)
@@ -0,0 +1,102 @@
+"""HTTP validators for catalog reads.
+
+Each catalog table has a ``CatalogVersion`` row whose counter is bumped after
+any write to that table commits (model signals plus the bulk paths that bypass
+them), once per transaction. Bumping inside the writing transaction would hold
+the row lock until commit and serialise all circulation behind it. List
+responses are validated against the versions of the tables they render, book
+details against ``Book.updated_at`` as well, so an unchanged resource answers
+``If-None-Match``/``If-Modified-Since`` with a 304 before the queryset is
+evaluated.
+"""
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from library_management_system.db import on_commit_once
+
+from .models import CatalogVersion
+
+BOOK, AUTHOR, CATEGORY = 'book', 'author', 'category'
+# Bumped only when a book title/ISBN or an author name changes; validates the suggestion index.
+SUGGEST = 'suggest'
+
+
+def _bump(name):
+    if not CatalogVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now()):
+        CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1})
+
+
+def bump_catalog_version(*names):
+    """Bump the tables' versions once the current transaction commits."""
+    for name in names:
+        on_commit_once(('catalog_version', name), partial(_bump, name))
+
+
+def catalog_versions(names):
+    """``{name: (version, updated_at)}`` for the given tables, in one query."""
+    return {
+        name: (version, updated_at)
+        for name, version, updated_at in CatalogVersion.objects.filter(name__in=names).values_list(
+            'name', 'version', 'updated_at')
+    }
+
+
+class ConditionalGetMixin:
+    """ETag/Last-Modified validation and Cache-Control for read-only actions.
+
+    ``catalog_tables`` lists the tables whose versions the responses depend on.
+    When the model has ``updated_at``, detail responses are validated against
+    it plus ``object_tables`` (the related tables they render) instead.
+    """
+    catalog_tables = ()
+    object_tables = None
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, None, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, kwargs.get(self.lookup_url_kwarg or self.lookup_field), super().retrieve,
+                                 *args, **kwargs)
+
+    def get_object_modified(self, lookup):
+        """Last modification time of a single object, if the model tracks one."""
+        if not any(field.name == 'updated_at' for field in self.queryset.model._meta.fields):
+            return None
+        return self.queryset.filter(**{self.lookup_field: lookup}).values_list('updated_at', flat=True).first()
+
+    def _validators(self, request, lookup):
+        tables = self.catalog_tables
+        parts, modified = [], []
+        if lookup is not None:
+            object_modified = self.get_object_modified(lookup)
+            if object_modified is not None:
+                parts.append(object_modified.isoformat())
+                modified.append(object_modified)
+                if self.object_tables is not None:
+                    tables = self.object_tables
+        versions = catalog_versions(tables)
+        parts += [f'{name}:{versions.get(name, (0,))[0]}' for name in tables]
+        modified += [updated_at for _, updated_at in versions.values()]
+        parts += [request.get_full_path(), request.accepted_renderer.format]
+        etag = quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+        return etag, max(modified) if modified else None
+
+    def _conditional(self, request, lookup, handler, *args, **kwargs):
+        etag, last_modified = self._validators(request, lookup)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_cache_control(response, public=True, max_age=settings.CATALOG_CACHE_MAX_AGE)
+            patch_vary_headers(response, ['Accept'])
+        return response
@@ -0,0 +1,63 @@
+"""Facet counts for catalog browsing.
+
+Each facet is one grouped query over the current filtered queryset:
+category, published-year decade and availability return a handful of rows;
+authors, nearly one per book, are sorted and cut to ``author_limit`` in the
+database. Results are cached under a key that includes the catalog versions,
+so any catalog write invalidates them.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, F, IntegerField, Value, When
+
+from .caching import AUTHOR, BOOK, CATEGORY, catalog_versions
+
+FACETS_CACHE_TIMEOUT = 300
+DEFAULT_AUTHOR_LIMIT = 20
+
+
+def decade_expression():
+    return ExpressionWrapper(F('published_year') / 10 * 10, output_field=IntegerField())
+
+
+def compute_facets(queryset, author_limit=DEFAULT_AUTHOR_LIMIT):
+    base = queryset.order_by()
+    availability = dict(
+        base.annotate(facet_available=Case(When(available_count__gt=0, then=Value(True)), default=Value(False),
+                                           output_field=BooleanField()))
+        .values('facet_available').annotate(count=Count('id')).values_list('facet_available', 'count')
+    )
+    categories = base.values('category_id', 'category__name').annotate(count=Count('id'))
+    # Authors are close to unique per book, so only the top ones leave the database.
+    authors = (
+        base.values('author_id', 'author__name').annotate(count=Count('id'))
+        .order_by('-count', 'author__name')[:author_limit]
+    )
+    decades = base.annotate(facet_decade=decade_expression()).values('facet_decade').annotate(count=Count('id'))
+
+    return {
+        'total': sum(availability.values()),
+        'categories': [
+            {'id': row['category_id'], 'name': row['category__name'], 'count': row['count']}
+            for row in sorted(categories, key=lambda row: (-row['count'], row['category__name'] or ''))
+        ],
+        'authors': [{'id': row['author_id'], 'name': row['author__name'], 'count': row['count']} for row in authors],
+        'decades': [
+            {'decade': row['facet_decade'], 'count': row['count']}
+            for row in sorted(decades, key=lambda row: (row['facet_decade'] is None, row['facet_decade'] or 0))
+        ],
+        'availability': {'available': availability.get(True, 0), 'unavailable': availability.get(False, 0)},
+    }
+
+
+def cached_facets(queryset, params, author_limit=DEFAULT_AUTHOR_LIMIT):
+    """``compute_facets`` memoised per filter parameters and catalog version."""
+    versions = catalog_versions((BOOK, AUTHOR, CATEGORY))
+    raw = repr((sorted(params.items()), author_limit, sorted((name, v[0]) for name, v in versions.items())))
+    key = 'book-facets:' + hashlib.md5(raw.encode()).hexdigest()
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset, author_limit)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,13 @@
+from rest_framework import filters
+
+from .search import search_books
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """``?search=`` backed by the catalog full-text index, ranked by relevance."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return search_books(queryset, ' '.join(terms))
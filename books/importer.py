@@ -0,0 +1,207 @@
+"""Bulk catalog import.
+
+Records are streamed from CSV or JSON Lines and written in fixed-size batches:
+authors and categories are resolved through in-memory name -> id maps (creating
+missing ones in bulk) and books are upserted on ISBN with a single
+``bulk_create`` per batch. Each batch commits on its own, so an interrupted
+import can resume after the last completed batch.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+
+from . import search
+from .caching import AUTHOR, BOOK, CATEGORY, SUGGEST, bump_catalog_version
+from .models import Author, Book, Category
+
+BOOK_UPDATE_FIELDS = [
+    'title', 'author', 'category', 'quantity', 'available_count', 'description', 'published_year', 'updated_at',
+]
+# Stored columns an existing book keeps when the record leaves them blank.
+EXISTING_FIELDS = ('quantity', 'available_count', 'category_id', 'description', 'published_year')
+NEW_BOOK_DEFAULTS = {'quantity': 1, 'category_id': None, 'description': '', 'published_year': None}
+
+
+class ImportRecordError(ValueError):
+    pass
+
+
+def detect_format(path):
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_records(path, fmt=None):
+    """Yield raw record dicts from a CSV (with header row) or JSON Lines file."""
+    fmt = fmt or detect_format(path)
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Reported as a skipped row rather than aborting the import.
+                    yield None
+
+
+def _text(record, name, required=False):
+    value = record.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ImportRecordError(f'missing {name}')
+    return value
+
+
+def _number(record, name):
+    value = _text(record, name)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ImportRecordError(f'{name} must be an integer')
+    if number < 0:
+        raise ImportRecordError(f'{name} must not be negative')
+    return number
+
+
+def clean_record(record):
+    """Normalise one raw record, raising ImportRecordError if it is unusable."""
+    if not isinstance(record, dict):
+        raise ImportRecordError('not a valid record')
+    cleaned = {
+        'isbn': _text(record, 'isbn', required=True),
+        'title': _text(record, 'title', required=True),
+        'author': _text(record, 'author', required=True),
+        'category': _text(record, 'category'),
+        'quantity': _number(record, 'quantity'),
+        'available_count': _number(record, 'available_count'),
+        'description': _text(record, 'description'),
+        'published_year': _number(record, 'published_year'),
+    }
+    for model, field, key in ((Book, 'isbn', 'isbn'), (Book, 'title', 'title'),
+                              (Author, 'name', 'author'), (Category, 'name', 'category')):
+        max_length = model._meta.get_field(field).max_length
+        if len(cleaned[key]) > max_length:
+            raise ImportRecordError(f'{key} is longer than {max_length} characters')
+    return cleaned
+
+
+class CatalogImporter:
+    """Upsert books on ISBN in batches.
+
+    Optional columns a record leaves blank (or does not have) keep the stored
+    values of an existing book; a new book gets the model defaults, one copy
+    and no category. ``available_count`` is taken from the record when given;
+    otherwise an existing book keeps its copies on loan and a new book starts
+    fully available. It is always clamped to ``quantity`` (``Book.save`` does
+    that for single saves, but ``bulk_create`` bypasses it).
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        self.author_ids = {}
+        self.category_ids = {}
+        self.rows = 0
+        self.written = 0
+        self.skipped = 0
+        self.errors = []
+
+    def run(self, records, start_batch=0, on_batch=None):
+        """Import an iterable of raw records, skipping the first ``start_batch`` batches.
+
+        ``on_batch(batch_number, importer)`` is called after each batch commits.
+        """
+        records = iter(records)
+        batch_number = 0
+        started = time.monotonic()
+        while True:
+            raw = list(islice(records, self.batch_size))
+            if not raw:
+                break
+            batch_number += 1
+            if batch_number <= start_batch:
+                continue
+            self.import_batch(raw, first_row=(batch_number - 1) * self.batch_size + 1)
+            if on_batch:
+                on_batch(batch_number, self)
+            if self.progress:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.progress(
+                    f'batch {batch_number}: {self.rows} rows read, {self.written} written, '
+                    f'{self.skipped} skipped ({self.rows / elapsed:.0f} rows/s)'
+                )
+        return self
+
+    def import_batch(self, raw_records, first_row=1):
+        books = {}
+        for offset, record in enumerate(raw_records):
+            self.rows += 1
+            try:
+                cleaned = clean_record(record)
+            except ImportRecordError as exc:
+                self.skipped += 1
+                self.errors.append((first_row + offset, str(exc)))
+                continue
+            # The last occurrence of an ISBN within a batch wins.
+            books[cleaned['isbn']] = cleaned
+        if not books:
+            return
+
+        with transaction.atomic():
+            self._resolve(Author, self.author_ids, {book['author'] for book in books.values()})
+            self._resolve(Category, self.category_ids, {book['category'] for book in books.values() if book['category']})
+            existing = {
+                row['isbn']: row
+                for row in Book.objects.filter(isbn__in=books).values('isbn', *EXISTING_FIELDS)
+            }
+            objs = [self._build(book, existing.get(book['isbn'])) for book in books.values()]
+            Book.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['isbn'],
+                update_fields=BOOK_UPDATE_FIELDS,
+            )
+            search.index_books(Book.objects.filter(isbn__in=books).values_list('id', flat=True))
+            bump_catalog_version(BOOK, AUTHOR, CATEGORY, SUGGEST)
+        self.written += len(objs)
+
+    def _build(self, record, existing):
+        stored = existing or NEW_BOOK_DEFAULTS
+        quantity = stored['quantity'] if record['quantity'] is None else record['quantity']
+        available = record['available_count']
+        if available is None:
+            if existing:
+                on_loan = max(existing['quantity'] - existing['available_count'], 0)
+                available = max(quantity - on_loan, 0)
+            else:
+                available = quantity
+        return Book(
+            isbn=record['isbn'],
+            title=record['title'],
+            author_id=self.author_ids[record['author']],
+            category_id=self.category_ids[record['category']] if record['category'] else stored['category_id'],
+            quantity=quantity,
+            available_count=min(available, quantity),
+            description=record['description'] or stored['description'],
+            published_year=stored['published_year'] if record['published_year'] is None else record['published_year'],
+        )
+
+    @staticmethod
+    def _resolve(model, cache, names):
+        missing = names - cache.keys()
+        if not missing:
+            return
+        cache.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+        missing -= cache.keys()
+        if missing:
+            model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+            cache.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
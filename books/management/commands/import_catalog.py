@@ -0,0 +1,64 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importer import CatalogImporter, detect_format, read_records
+
+
+class Command(BaseCommand):
+    help = 'Import books from a CSV or JSON Lines file, upserting on ISBN'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header row) or JSON Lines file')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records per batch/transaction')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+
+        start_batch = 0
+        if os.path.exists(checkpoint) and not options['restart']:
+            with open(checkpoint) as handle:
+                state = json.load(handle)
+            if state.get('batch_size') != batch_size:
+                raise CommandError(
+                    f'{checkpoint} was written with --batch-size {state.get("batch_size")}; '
+                    'use the same batch size or --restart'
+                )
+            start_batch = state['batches']
+            self.stdout.write(f'Resuming after batch {start_batch} ({state["rows"]} rows already imported)')
+
+        def save_checkpoint(batch_number, importer):
+            with open(checkpoint, 'w') as handle:
+                json.dump({
+                    'source': os.path.abspath(path),
+                    'batch_size': batch_size,
+                    'batches': batch_number,
+                    'rows': batch_number * batch_size,
+                }, handle)
+
+        importer = CatalogImporter(batch_size=batch_size, progress=self.stdout.write)
+        importer.run(
+            read_records(path, options['format'] or detect_format(path)),
+            start_batch=start_batch,
+            on_batch=save_checkpoint,
+        )
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        for row, message in importer.errors[:20]:
+            self.stderr.write(f'row {row}: {message}')
+        if len(importer.errors) > 20:
+            self.stderr.write(f'... and {len(importer.errors) - 20} more skipped rows')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.written} books ({importer.skipped} skipped)'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from books.models import Book
+from books.search import is_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for the book catalog'
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(self.style.WARNING('Full-text search is not supported on this database backend.'))
+            return
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {Book.objects.count()} books'))
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from books.search import create_search_index, rebuild_search_index
+
+    create_search_index(schema_editor.connection)
+    rebuild_search_index(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from books.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
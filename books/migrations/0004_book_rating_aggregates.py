@@ -0,0 +1,71 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:13
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    Review = apps.get_model('reviews', 'Review')
+    approved = Review.objects.filter(book=OuterRef('pk'), status='APPROVED')
+    Book.objects.update(**{
+        f'rating_{star}': Coalesce(
+            Subquery(approved.filter(rating=star).values('book').annotate(c=Count('id')).values('c')), 0
+        )
+        for star in range(1, 6)
+    })
+    Book.objects.update(rating_count=sum((F(f'rating_{star}') for star in range(1, 6)), Value(0)))
+    total = sum((F(f'rating_{star}') * star for star in range(1, 6)), Value(0))
+    Book.objects.update(avg_rating=Case(
+        When(rating_count=0, then=Value(0.0)),
+        default=Cast(total, FloatField()) / F('rating_count'),
+        output_field=FloatField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_book_title_id_idx'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='avg_rating',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
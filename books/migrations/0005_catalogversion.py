@@ -0,0 +1,31 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:17
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_versions(apps, schema_editor):
+    CatalogVersion = apps.get_model('books', 'CatalogVersion')
+    now = timezone.now()
+    for name in ('book', 'author', 'category'):
+        CatalogVersion.objects.get_or_create(name=name, defaults={'version': 1, 'updated_at': now})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_book_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_versions, migrations.RunPython.noop),
+    ]
@@ -18,6 +18,16 @@ class Category(models.Model):
         return self.name
 
 
+class CatalogVersion(models.Model):
+    """Change counter per catalog table, used to validate cached catalog reads."""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} v{self.version}"
+
+
 class Book(models.Model):
     isbn = models.CharField(max_length=20, unique=True)
     title = models.CharField(max_length=255)
@@ -27,9 +37,22 @@ class Book(models.Model):
     available_count = models.PositiveIntegerField(default=1)
     description = models.TextField(blank=True)
     published_year = models.PositiveIntegerField(blank=True, null=True)
+    # Approved-review aggregates, maintained by reviews.utils.
+    avg_rating = models.FloatField(default=0, db_index=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.title} ({self.isbn})"
 
@@ -37,6 +60,10 @@ class Book(models.Model):
     def is_available(self) -> bool:
         return self.available_count > 0
 
+    @property
+    def rating_histogram(self) -> dict:
+        return {star: getattr(self, f'rating_{star}') for star in range(1, 6)}
+
     def save(self, *args, **kwargs):
         if self.available_count > self.quantity:
             self.available_count = self.quantity
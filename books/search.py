@@ -0,0 +1,177 @@
+"""Full-text search over the book catalog.
+
+SQLite keeps an FTS5 virtual table keyed by book id (rowid); PostgreSQL keeps a
+side table with a weighted tsvector per book behind a GIN index. Both are
+refreshed from Book/Author/Category signals (see ``books.signals``) and by the
+bulk paths that bypass ``save()``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Author, Book, Category
+
+FTS_TABLE = 'books_book_fts'
+CHUNK_SIZE = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Column weights for bm25(): title, author, category, description, isbn.
+_SQLITE_RANK = 'bm25(10.0, 5.0, 2.0, 1.0, 10.0)'
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor in ('sqlite', 'postgresql')
+
+
+def create_search_index(conn):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "title, author, category, description, isbn, tokenize = 'porter unicode61')"
+            )
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', %s)", [_SQLITE_RANK])
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {FTS_TABLE} ("
+                f"book_id bigint PRIMARY KEY REFERENCES {Book._meta.db_table}(id) "
+                "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_idx ON {FTS_TABLE} USING GIN (document)")
+
+
+def drop_search_index(conn):
+    if is_supported(conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _document_select(vendor):
+    book, author, category = Book._meta.db_table, Author._meta.db_table, Category._meta.db_table
+    joins = (
+        f"FROM {book} b INNER JOIN {author} a ON a.id = b.author_id "
+        f"LEFT OUTER JOIN {category} c ON c.id = b.category_id"
+    )
+    if vendor == 'sqlite':
+        return (
+            f"SELECT b.id, b.title, a.name, COALESCE(c.name, ''), b.description, b.isbn {joins}"
+        )
+    return (
+        "SELECT b.id, "
+        "setweight(to_tsvector('english', b.title), 'A') || "
+        "setweight(to_tsvector('simple', b.isbn), 'A') || "
+        "setweight(to_tsvector('english', a.name), 'B') || "
+        "setweight(to_tsvector('english', COALESCE(c.name, '')), 'C') || "
+        f"setweight(to_tsvector('english', b.description), 'D') {joins}"
+    )
+
+
+def _write_documents(cursor, vendor, where='', params=()):
+    select = _document_select(vendor)
+    if vendor == 'sqlite':
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, author, category, description, isbn) {select} {where}",
+            params,
+        )
+    else:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(book_id, document) {select} {where} "
+            "ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document",
+            params,
+        )
+
+
+def index_books(book_ids):
+    """(Re)build the search documents for the given book ids."""
+    if not is_supported():
+        return
+    ids = list(book_ids)
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start:start + CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            if vendor == 'sqlite':
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+            _write_documents(cursor, vendor, f"WHERE b.id IN ({placeholders})", chunk)
+
+
+def remove_books(book_ids):
+    """Drop search documents for deleted books (PostgreSQL cascades on its own)."""
+    if connection.vendor != 'sqlite':
+        return
+    ids = list(book_ids)
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start:start + CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+
+def rebuild_search_index(conn=None):
+    """Rebuild every search document in one set-based pass."""
+    conn = conn or connection
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        _write_documents(cursor, conn.vendor)
+
+
+def search_terms(text):
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def _match_expression(terms, vendor):
+    # The last term is treated as a prefix so partially typed words still match.
+    if vendor == 'sqlite':
+        quoted = ['"%s"' % term for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+    return ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+
+
+def search_books(queryset, text):
+    """Restrict a Book queryset to full-text matches, best matches first.
+
+    Adds a ``search_rank`` attribute (higher is better) to each result.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    vendor = connection.vendor
+    book_table = Book._meta.db_table
+    match = _match_expression(terms, vendor)
+
+    if vendor == 'sqlite':
+        queryset = queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE} MATCH %s', f'{FTS_TABLE}.rowid = {book_table}.id'],
+            params=[match],
+        )
+    elif vendor == 'postgresql':
+        queryset = queryset.extra(
+            select={'search_rank': f"ts_rank({FTS_TABLE}.document, to_tsquery('english', %s))"},
+            select_params=[match],
+            tables=[FTS_TABLE],
+            where=[
+                f"{FTS_TABLE}.document @@ to_tsquery('english', %s)",
+                f'{FTS_TABLE}.book_id = {book_table}.id',
+            ],
+            params=[match],
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term) | Q(isbn__icontains=term) | Q(author__name__icontains=term)
+                | Q(category__name__icontains=term) | Q(description__icontains=term)
+            )
+        return queryset.filter(condition).order_by('title')
+
+    return queryset.order_by('-search_rank', 'title')
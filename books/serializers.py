@@ -1,17 +1,70 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import Author, Category, Book
 
+
+def query_param_list(request, name):
+    raw = request.query_params.get(name, '') if request is not None else ''
+    return [item.strip() for item in raw.split(',') if item.strip()]
+
+
+def wants_compact(request):
+    return request is not None and request.query_params.get('compact', '').lower() in ('1', 'true', 'yes')
+
+
+class SparseFieldsetMixin:
+    """Shape read responses from the query string.
+
+    ``?fields=a,b`` keeps only the listed fields. With ``?compact=true`` the
+    relations in ``compact_relations`` are rendered as ``<name>_id`` instead of
+    nested objects, unless named in ``?expand=``. Only the top-level serializer
+    of a read request is affected.
+    """
+    compact_relations = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or self.root not in (self, self.parent):
+            return fields
+
+        if wants_compact(request):
+            expand = set(query_param_list(request, 'expand'))
+            for name in self.compact_relations:
+                if name not in expand:
+                    fields.pop(name, None)
+                    fields[f'{name}_id'] = serializers.IntegerField(read_only=True)
+
+        requested = query_param_list(request, 'fields')
+        if requested:
+            for name in set(fields) - set(requested):
+                fields.pop(name)
+        return fields
+
+
 class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Author
         fields = '__all__'
 
+class AuthorSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Author
+        fields = ['id', 'name']
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class BookSerializer(serializers.ModelSerializer):
+class CategorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name']
+
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    compact_relations = ('author', 'category')
+
     author = AuthorSerializer(read_only=True)
     author_id = serializers.PrimaryKeyRelatedField(
         queryset=Author.objects.all(), source='author', write_only=True
@@ -22,11 +75,39 @@ class BookSerializer(serializers.ModelSerializer):
     )
     
     is_available = serializers.BooleanField(read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = Book
         fields = [
             'id', 'isbn', 'title', 'author', 'author_id', 'category', 'category_id',
             'quantity', 'available_count', 'description', 'published_year',
-            'created_at', 'updated_at', 'is_available'
+            'created_at', 'updated_at', 'is_available',
+            'avg_rating', 'rating_count', 'rating_histogram'
         ]
+        read_only_fields = ['avg_rating', 'rating_count']
+
+
+class BookBulkItemSerializer(serializers.Serializer):
+    """One item of a bulk upsert; references are checked in bulk by ``books.bulk``."""
+    isbn = serializers.CharField(max_length=Book._meta.get_field('isbn').max_length)
+    title = serializers.CharField(max_length=Book._meta.get_field('title').max_length, required=False)
+    author_id = serializers.IntegerField(required=False)
+    category_id = serializers.IntegerField(required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+    available_count = serializers.IntegerField(min_value=0, required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
+    published_year = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+
+
+def side_load_relations(books, exclude=()):
+    """Deduplicated ``authors``/``categories`` maps for a compact page of books."""
+    side_loaded = {}
+    if 'author' not in exclude:
+        authors = Author.objects.filter(id__in={book.author_id for book in books}).only('id', 'name')
+        side_loaded['authors'] = {author.id: AuthorSummarySerializer(author).data for author in authors}
+    if 'category' not in exclude:
+        category_ids = {book.category_id for book in books if book.category_id}
+        categories = Category.objects.filter(id__in=category_ids).only('id', 'name')
+        side_loaded['categories'] = {category.id: CategorySummarySerializer(category).data for category in categories}
+    return side_loaded
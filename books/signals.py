@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, search
+from .caching import AUTHOR, BOOK, CATEGORY, SUGGEST, bump_catalog_version
+from .models import Author, Book, Category
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_label(sender, instance, raw=False, **kwargs):
+    # Most saves leave the title and ISBN alone; only those that change them touch the suggestions.
+    if not raw and instance.pk is not None:
+        instance._suggest_label = Book.objects.filter(pk=instance.pk).values_list('title', 'isbn').first()
+
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_books([instance.pk])
+        bump_catalog_version(BOOK)
+        if getattr(instance, '_suggest_label', None) != (instance.title, instance.isbn):
+            bump_catalog_version(SUGGEST)
+            transaction.on_commit(
+                lambda: autocomplete.index.update('book', instance.pk, instance.title, instance.isbn))
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    search.remove_books([instance.pk])
+    bump_catalog_version(BOOK, SUGGEST)
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove('book', pk))
+
+
+@receiver(post_save, sender=Author)
+def reindex_author_books(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        search.index_books(instance.books.values_list('id', flat=True))
+    bump_catalog_version(AUTHOR, SUGGEST)
+    transaction.on_commit(lambda: autocomplete.index.update('author', instance.pk, instance.name))
+
+
+@receiver(post_delete, sender=Author)
+def author_deleted(sender, instance, **kwargs):
+    bump_catalog_version(AUTHOR, SUGGEST)
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.index.remove('author', pk))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_books(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        search.index_books(instance.books.values_list('id', flat=True))
+    bump_catalog_version(CATEGORY)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_books(sender, instance, **kwargs):
+    # Books are detached with SET_NULL (no Book signals), so reindex them afterwards.
+    instance._search_book_ids = list(instance.books.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_detached_books(sender, instance, **kwargs):
+    search.index_books(getattr(instance, '_search_book_ids', []))
+    bump_catalog_version(CATEGORY)
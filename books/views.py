@@ -1,7 +1,6 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.db.models import Avg, Q
 from django.shortcuts import get_object_or_404, redirect, render
 
 from accounts.decorators import role_required
@@ -9,26 +8,36 @@ from accounts.models import UserProfile
 
 from .forms import AuthorForm, BookForm, CategoryForm
 from .models import Author, Book, Category
+from .search import search_books
 
 
 @login_required
 def book_list(request):
     query = request.GET.get('q', '')
     category_id = request.GET.get('category')
+    min_rating = request.GET.get('min_rating')
+    sort = request.GET.get('sort')
 
-    books = Book.objects.select_related('author', 'category').annotate(
-        avg_rating=Avg('reviews__rating', filter=Q(reviews__status='APPROVED'))
-    )
-    if query:
-        books = books.filter(title__icontains=query) | books.filter(author__name__icontains=query)
+    books = Book.objects.select_related('author', 'category')
     if category_id:
         books = books.filter(category_id=category_id)
+    if min_rating:
+        try:
+            books = books.filter(avg_rating__gte=float(min_rating))
+        except ValueError:
+            pass
+    if query:
+        books = search_books(books, query)
+    else:
+        books = books.order_by('title')
+    if sort == 'rating':
+        books = books.order_by('-avg_rating', '-rating_count', 'title')
 
-    paginator = Paginator(books.order_by('title'), 10)
+    paginator = Paginator(books, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     categories = Category.objects.all()
-    return render(request, 'student/browse_books.html', {'page_obj': page_obj, 'categories': categories, 'query': query, 'selected_category': category_id})
+    return render(request, 'student/browse_books.html', {'page_obj': page_obj, 'categories': categories, 'query': query, 'selected_category': category_id, 'sort': sort, 'min_rating': min_rating})
 
 
 @login_required
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fine_payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='finepayment',
+            index=models.Index(fields=['status', 'created_at'], name='finepay_status_created_idx'),
+        ),
+    ]
@@ -23,6 +23,9 @@ class FinePayment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='finepay_status_created_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"Payment {self.amount} for fine {self.fine_id}"
@@ -1,4 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
+from transactions.events import record_event
+from transactions.models import CirculationEvent
 from .models import FinePayment
 
 class FinePaymentSerializer(serializers.ModelSerializer):
@@ -17,4 +20,8 @@ class FinePaymentSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         # In a real app, this would be pending until payment gateway callback
         validated_data['status'] = FinePayment.STATUS_PAID 
-        return super().create(validated_data)
+        with transaction.atomic():
+            payment = super().create(validated_data)
+            record_event(CirculationEvent.KIND_PAID, payment.fine.loan, fine_id=payment.fine_id,
+                         payment_id=payment.pk, amount=payment.amount)
+        return payment
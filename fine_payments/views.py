@@ -6,7 +6,8 @@ from django.shortcuts import get_object_or_404, redirect, render
 from accounts.decorators import role_required
 from accounts.models import UserProfile
 from notifications.utils import notify_user
-from transactions.models import Fine
+from transactions.events import record_event
+from transactions.models import CirculationEvent, Fine
 
 from .forms import FinePaymentForm
 from .models import FinePayment
@@ -27,6 +28,8 @@ def pay_fine(request, fine_id):
             payment.save()
             fine.paid = True
             fine.save(update_fields=['paid'])
+            record_event(CirculationEvent.KIND_PAID, fine.issue, fine_id=fine.pk, payment_id=payment.pk,
+                         amount=payment.amount)
             notify_user(request.user, f"Fine payment of {payment.amount} recorded.", category='fine')
             messages.success(request, 'Payment recorded as paid (simulated).')
             return redirect('fine_payments:my-payments')
@@ -38,12 +41,12 @@ def pay_fine(request, fine_id):
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def my_payments(request):
-    payments = FinePayment.objects.filter(user=request.user).select_related('fine__issue__book')
+    payments = FinePayment.objects.filter(user=request.user).select_related('fine__issue__book', 'fine__archived_issue__book')
     return render(request, 'fine_payments/my_payments.html', {'payments': payments})
 
 
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def admin_payments(request):
-    payments = FinePayment.objects.select_related('fine__issue__book', 'user')
+    payments = FinePayment.objects.select_related('fine__issue__book', 'fine__archived_issue__book', 'user')
     return render(request, 'fine_payments/admin_list.html', {'payments': payments})
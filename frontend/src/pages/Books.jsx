@@ -11,6 +11,7 @@ const Books = () => {
     const [books, setBooks] = useState([]);
     const [loading, setLoading] = useState(true);
     const [search, setSearch] = useState('');
+    const [suggestions, setSuggestions] = useState([]);
     const { user } = useAuth();
     const [requestStatus, setRequestStatus] = useState({});
     const [page, setPage] = useState(1);
@@ -70,6 +71,27 @@ const Books = () => {
         return () => debouncedFetch.cancel();
     }, [search, page, debouncedFetch]);
 
+    // Typeahead suggestions come from a cheap in-memory index, so they can refresh faster than the list
+    const debouncedSuggest = useCallback(
+        debounce(async (searchTerm) => {
+            if (!searchTerm.trim()) {
+                setSuggestions([]);
+                return;
+            }
+            try {
+                setSuggestions(await BookService.autocomplete(searchTerm));
+            } catch (error) {
+                setSuggestions([]);
+            }
+        }, 120),
+        []
+    );
+
+    useEffect(() => {
+        debouncedSuggest(search);
+        return () => debouncedSuggest.cancel();
+    }, [search, debouncedSuggest]);
+
     const handleSearch = (e) => {
         setSearch(e.target.value);
         setPage(1); // Reset to page 1 on search
@@ -198,8 +220,14 @@ const Books = () => {
                             placeholder="Search by title, author, or ISBN..."
                             value={search}
                             onChange={handleSearch}
+                            list="book-suggestions"
                             className="input-field !pl-12 py-2.5"
                         />
+                        <datalist id="book-suggestions">
+                            {suggestions.map((suggestion) => (
+                                <option key={`${suggestion.type}-${suggestion.id}`} value={suggestion.label} />
+                            ))}
+                        </datalist>
                     </div>
                     {user?.profile?.is_admin && (
                         <button
@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { Book, Clock, AlertCircle, History, Lightbulb, Library, CheckCircle, PieChart as PieIcon, TrendingUp, Users, DollarSign, Activity, BookOpen, ArrowUpRight, BarChart as BarIcon, IndianRupee } from 'lucide-react';
 import AnalyticsService from '../services/analytics.service';
+import NotificationService from '../services/notification.service';
 import api from '../services/api';
 import { PieChart, Pie, Cell, ResponsiveContainer, Tooltip, Legend, AreaChart, Area, XAxis, YAxis, CartesianGrid, BarChart, Bar } from 'recharts';
 
@@ -81,12 +82,19 @@ const Dashboard = () => {
 
         fetchData();
 
-        // Auto-refresh for Admin/Owner stats every 30 seconds
-        let interval;
-        if (isAdminOrOwner) {
-            interval = setInterval(fetchData, 30000);
-        }
-        return () => clearInterval(interval);
+        // Refresh when the server pushes a change instead of polling.
+        let refreshTimer;
+        const scheduleRefresh = () => {
+            clearTimeout(refreshTimer);
+            refreshTimer = setTimeout(fetchData, 1000);
+        };
+        const unsubscribe = NotificationService.subscribe(
+            isAdminOrOwner ? { queues: scheduleRefresh } : { notification: scheduleRefresh }
+        );
+        return () => {
+            clearTimeout(refreshTimer);
+            unsubscribe();
+        };
 
     }, [user, isAdminOrOwner]);
 
@@ -8,6 +8,14 @@ const Notifications = () => {
 
     useEffect(() => {
         fetchNotifications();
+        // New notifications arrive over the live stream; a coalesced one replaces
+        // its earlier version and moves to the top.
+        return NotificationService.subscribe({
+            notification: (notification) => setNotifications((current) => [
+                { ...notification, is_read: false },
+                ...current.filter(n => n.id !== notification.id),
+            ]),
+        });
     }, []);
 
     const fetchNotifications = async () => {
@@ -79,7 +87,7 @@ const Notifications = () => {
                             </p>
                             <p className="text-xs text-slate-400 mt-1.5 flex items-center gap-1">
                                 <Clock className="w-3 h-3" />
-                                {new Date(notification.created_at).toLocaleString()}
+                                {new Date(notification.updated_at || notification.created_at).toLocaleString()}
                             </p>
                         </div>
                         {!notification.is_read && (
@@ -6,6 +6,11 @@ const BookService = {
         return response.data;
     },
 
+    autocomplete: async (q, limit = 8) => {
+        const response = await api.get('books/autocomplete/', { params: { q, limit } });
+        return response.data.results;
+    },
+
     get: async (id) => {
         const response = await api.get(`books/${id}/`);
         return response.data;
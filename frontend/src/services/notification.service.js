@@ -19,6 +19,16 @@ const NotificationService = {
     getUnreadCount: async () => {
         const response = await api.get('notifications/unread_count/');
         return response.data;
+    },
+
+    // Live stream of `notification` and `unread` events, plus `queues` (pending
+    // staff work) for admins and owners. Returns a function that closes it.
+    subscribe: (handlers) => {
+        const source = new EventSource(`${api.defaults.baseURL}notifications/stream/`, { withCredentials: true });
+        Object.entries(handlers).forEach(([type, handler]) => {
+            source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+        });
+        return () => source.close();
     }
 };
 
@@ -0,0 +1,21 @@
+from django.db import transaction
+
+
+def on_commit_once(key, func, using=None):
+    """Like ``transaction.on_commit``, but ``func`` runs once per transaction however often ``key`` is registered.
+
+    A hook dropped by a savepoint rollback no longer counts, so the next
+    registration under the same key queues it again.
+    """
+    connection = transaction.get_connection(using)
+    pending = connection.__dict__.setdefault('_on_commit_once', {})
+    hook = pending.get(key)
+    if hook is not None and any(registered is hook for _, registered, _ in connection.run_on_commit):
+        return
+
+    def hook():
+        pending.pop(key, None)
+        func()
+
+    pending[key] = hook
+    transaction.on_commit(hook, using=using)
@@ -0,0 +1,143 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class HybridPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in keyset (cursor) mode.
+
+    Views that declare ``keyset_ordering`` (e.g. ``('-created_at', '-id')``) can be
+    paged with ``?cursor=`` (empty for the first page) or ``?pagination=cursor``.
+    Keyset pages seek on the ordering columns instead of using OFFSET and do not
+    run a COUNT query, so the response only carries ``next``/``previous`` links.
+    The ordering columns must be non-null and end with a unique column.
+
+    Keyset mode only applies while the queryset is in ``keyset_ordering`` order
+    (or not explicitly ordered). Under another ordering, such as ``?ordering=``
+    or search relevance, the request falls back to page numbers rather than
+    replacing the order the client asked for.
+    """
+    cursor_query_param = 'cursor'
+    pagination_query_param = 'pagination'
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and self.wants_keyset(request) and self.follows_ordering(queryset, ordering):
+            self.keyset = True
+            return self.paginate_keyset(queryset, request, ordering)
+        return super().paginate_queryset(queryset, request, view)
+
+    def wants_keyset(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or params.get(self.pagination_query_param) == 'cursor'
+
+    @staticmethod
+    def follows_ordering(queryset, ordering):
+        """Whether the queryset's explicit ordering, if any, is a prefix of ``ordering``."""
+        active = queryset.query.order_by
+        return all(isinstance(name, str) for name in active) and tuple(active) == tuple(ordering[:len(active)])
+
+    def paginate_keyset(self, queryset, request, ordering):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.page_query_param)
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = [name.startswith('-') for name in ordering]
+        page_size = self.get_page_size(request)
+
+        values, reverse = self.decode_cursor(queryset.model, request.query_params.get(self.cursor_query_param))
+        descending = [desc != reverse for desc in self.descending]
+        queryset = queryset.order_by(*[('-' if desc else '') + name for name, desc in zip(self.fields, descending)])
+        if values is not None:
+            queryset = queryset.filter(self.seek(values, descending))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            has_next, has_previous = values is not None, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        self.next_cursor = self.encode_cursor(rows[-1], False) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], True) if rows and has_previous else None
+        self.template = 'rest_framework/pagination/previous_and_next.html'
+        self.display_page_controls = bool(self.next_cursor or self.previous_cursor)
+        return rows
+
+    def seek(self, values, descending):
+        """Rows strictly after ``values`` in lexicographic ordering-column order."""
+        condition = Q()
+        for position, (name, desc) in enumerate(zip(self.fields, descending)):
+            step = Q(**{f'{name}__{"lt" if desc else "gt"}': values[position]})
+            for prior in range(position):
+                step &= Q(**{self.fields[prior]: values[prior]})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        payload = {'v': [_encode_value(getattr(row, name)) for name in self.fields]}
+        if reverse:
+            payload['r'] = 1
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, model, token):
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, raw_values)]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get('r'))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.next_cursor)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if self.previous_cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.previous_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_html_context(self):
+        if not self.keyset:
+            return super().get_html_context()
+        return {'previous_url': self.get_previous_link(), 'next_url': self.get_next_link()}
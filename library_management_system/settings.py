@@ -46,12 +46,13 @@ INSTALLED_APPS = [
     'system_settings',
     'return_extensions',
     'fine_payments',
+    'recommendations',
     'rest_framework',
     'corsheaders',
 ]
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'library_management_system.pagination.HybridPagination',
     'PAGE_SIZE': 10
 }
 
@@ -164,6 +165,8 @@ else:
 
 FINE_PER_DAY = float(os.environ.get('LIBRARY_FINE_PER_DAY', 5))
 ISSUE_DURATION_DAYS = int(os.environ.get('LIBRARY_ISSUE_DURATION_DAYS', 14))
+# Returned/rejected issues untouched for this long are moved to the archive table.
+ISSUE_ARCHIVE_AFTER_DAYS = int(os.environ.get('LIBRARY_ISSUE_ARCHIVE_AFTER_DAYS', 365))
 
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
@@ -191,6 +194,12 @@ _csrf_env = os.environ.get('CSRF_TRUSTED_ORIGINS', '')
 if _csrf_env:
     CSRF_TRUSTED_ORIGINS += [origin.strip() for origin in _csrf_env.split(',') if origin.strip()]
 
+# Catalog reads (books, authors, categories) may be cached by browsers and proxies for this long.
+CATALOG_CACHE_MAX_AGE = int(os.environ.get('CATALOG_CACHE_MAX_AGE', 60))
+
+# Memory-mapped content similarity index (see recommendations.content).
+SIMILARITY_INDEX_DIR = os.environ.get('SIMILARITY_INDEX_DIR', str(BASE_DIR / 'var' / 'similarity'))
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
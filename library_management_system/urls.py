@@ -11,6 +11,7 @@ from book_suggestions.api_views import BookSuggestionViewSet
 from reservations.api_views import ReservationViewSet
 from reviews.api_views import ReviewViewSet
 from notifications.api_views import NotificationViewSet
+from notifications.views import event_stream
 from return_extensions.api_views import ReturnExtensionViewSet
 from fine_payments.api_views import FinePaymentViewSet
 from system_settings.api_views import SettingViewSet
@@ -37,6 +38,8 @@ router.register(r'analytics/audit_logs', AuditLogViewSet, basename='analytics-au
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Before the router, whose notifications/<pk>/ route would match 'stream'.
+    path('api/notifications/stream/', event_stream, name='notification-stream'),
     path('api/', include(router.urls)),
     # path('api/analytics/dashboard/', ... removed as it is now in router
     path('api/reports/issued/pdf/', report_views.export_issued_pdf, name='report-issued-pdf'),
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Notification
+from .models import Notification, NotificationCounter
 
 
 @admin.register(Notification)
@@ -9,3 +9,9 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('category', 'read_at', 'created_at')
     search_fields = ('user__username', 'message')
     readonly_fields = ('created_at',)
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread')
+    search_fields = ('user__username',)
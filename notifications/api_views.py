@@ -1,13 +1,14 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
 from .models import Notification
 from .serializers import NotificationSerializer
+from .utils import mark_all_read, mark_notification_read, unread_count
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_ordering = ('-updated_at', '-id')
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
@@ -15,12 +16,14 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        if not notification.read_at:
-            notification.read_at = timezone.now()
-            notification.save()
+        mark_notification_read(notification)
         return Response(self.get_serializer(notification).data)
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        self.get_queryset().filter(read_at__isnull=True).update(read_at=timezone.now())
+        mark_all_read(request.user)
         return Response({'status': 'marked all as read'})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'count': unread_count(request.user)})
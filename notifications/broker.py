@@ -0,0 +1,96 @@
+"""Pub/sub for the live event stream.
+
+Write paths publish small JSON-able events to named channels
+(``user:<id>`` and ``admin``); ``notifications.views.event_stream`` subscribes
+each connected client to its channels. ``LocalBroker`` delivers within the
+current process only, which is enough for a single ASGI worker. Deployments
+with several workers point ``settings.NOTIFICATION_BROKER`` at a class with
+the same ``publish``/``subscribe``/``has_subscribers`` interface backed by a
+shared service (Redis pub/sub, PostgreSQL LISTEN/NOTIFY).
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+ADMIN_CHANNEL = 'admin'
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+class Subscription:
+    def __init__(self, broker, channels, loop, maxsize):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event):
+        # Runs on the subscriber's loop. A client too slow to keep up loses events
+        # rather than holding memory; it resynchronises on reconnect.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process fan-out. Safe to publish from any thread; subscribers live on event loops."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channels, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        """Subscribe the running event loop to ``channels``; call ``close()`` on the result when done."""
+        subscription = Subscription(self, channels, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def has_subscribers(self, channel):
+        return bool(self._subscriptions.get(channel))
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:  # the subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'NOTIFICATION_BROKER', 'notifications.broker.LocalBroker')
+                _broker = import_string(path)()
+    return _broker
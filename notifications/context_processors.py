@@ -1,4 +1,4 @@
-from .models import Notification
+from .utils import unread_count as user_unread_count
 
 __all__ = ["unread_count"]
 
@@ -8,7 +8,7 @@ def unread_count(request):
     user = getattr(request, "user", None)
 
     if user and user.is_authenticated:
-        count = Notification.objects.filter(user=user, read_at__isnull=True).count()
+        count = user_unread_count(user)
     else:
         count = 0
 
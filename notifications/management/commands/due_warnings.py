@@ -2,18 +2,65 @@ from datetime import date
 
 from django.core.management.base import BaseCommand
 
-from notifications.utils import notify_user
+from notifications.utils import notify_many
 from transactions.models import BookIssue
 
+DIGEST_KEY = 'due-digest'
+DIGEST_TITLES = 5
+
+
+def _warning(title, due_date, today):
+    if due_date == today:
+        return f"'{title}' is due today."
+    days = (today - due_date).days
+    return f"'{title}' is overdue by {days} day{'s' if days != 1 else ''}. Please return or request extension."
+
+
+def _digest(loans, today):
+    due = [title for title, due_date in loans if due_date == today]
+    overdue = [title for title, due_date in loans if due_date < today]
+    parts = []
+    for titles, state in ((due, 'due today'), (overdue, 'overdue')):
+        if titles:
+            shown = ', '.join(f"'{title}'" for title in titles[:DIGEST_TITLES])
+            more = f' and {len(titles) - DIGEST_TITLES} more' if len(titles) > DIGEST_TITLES else ''
+            parts.append(f'{shown}{more} {"is" if len(titles) == 1 else "are"} {state}')
+    return '; '.join(parts) + '.'
+
 
 class Command(BaseCommand):
     help = 'Send due/overdue warnings to users'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--digest', action='store_true',
+                            help="One message per user listing all their due and overdue books")
+
     def handle(self, *args, **options):
-        due_today = BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date=date.today())
-        overdue = BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date__lt=date.today())
-        for issue in due_today:
-            notify_user(issue.user, f"'{issue.book.title}' is due today.", category='issue')
-        for issue in overdue:
-            notify_user(issue.user, f"'{issue.book.title}' is overdue. Please return or request extension.", category='issue')
-        self.stdout.write(self.style.SUCCESS(f'Warnings sent: {due_today.count()} due, {overdue.count()} overdue'))
+        today = date.today()
+        issues = (
+            BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date__lte=today)
+            .order_by('user_id', 'due_date', 'id')
+            .values_list('id', 'user_id', 'book__title', 'due_date')
+        )
+        due, overdue = 0, 0
+        # Warnings coalesce per loan (or per user for the digest): a rerun updates
+        # the unread warning instead of adding another one.
+        with notify_many() as batch:
+            user_loans, current_user = [], None
+            for issue_id, user_id, title, due_date in issues.iterator(chunk_size=batch.batch_size):
+                if due_date == today:
+                    due += 1
+                else:
+                    overdue += 1
+                if not options['digest']:
+                    batch.add(user_id, _warning(title, due_date, today), category='issue',
+                              coalesce_key=f'issue:{issue_id}')
+                    continue
+                if user_id != current_user and user_loans:
+                    batch.add(current_user, _digest(user_loans, today), category='issue', coalesce_key=DIGEST_KEY)
+                    user_loans = []
+                current_user = user_id
+                user_loans.append((title, due_date))
+            if user_loans:
+                batch.add(current_user, _digest(user_loans, today), category='issue', coalesce_key=DIGEST_KEY)
+        self.stdout.write(self.style.SUCCESS(f'Warnings sent: {due} due, {overdue} overdue'))
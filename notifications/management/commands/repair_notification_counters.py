@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notifications.utils import repair_unread_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount unread notifications and fix the per-user counters that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drifted counters')
+
+    def handle(self, *args, **options):
+        drifted = repair_unread_counters(fix=not options['dry_run'])
+        for user_id, stored, actual in drifted[:20]:
+            self.stdout.write(f'user {user_id}: stored {stored}, actual {actual}')
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(drifted)} drifted counters'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_notif_user_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read_at'], name='notif_user_read_idx'),
+        ),
+    ]
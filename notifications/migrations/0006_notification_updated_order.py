@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='notification',
+            options={'ordering': ['-updated_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notif_user_created_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='notif_user_updated_id_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 
 class Notification(models.Model):
@@ -16,11 +17,28 @@ class Notification(models.Model):
     message = models.TextField()
     target_url = models.CharField(max_length=255, blank=True)
     category = models.CharField(max_length=30, choices=CATEGORY_CHOICES, default='general')
+    # Notifications sharing a non-empty key (per user and category) coalesce:
+    # a new one updates the user's unread one instead of adding a row.
+    coalesce_key = models.CharField(max_length=100, blank=True, default='')
+    occurrences = models.PositiveIntegerField(default=1)
     read_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['-created_at']
+        # Coalescing moves ``updated_at``, so a refreshed reminder comes back to the top.
+        ordering = ['-updated_at', '-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category', 'coalesce_key'],
+                condition=models.Q(read_at__isnull=True) & ~models.Q(coalesce_key=''),
+                name='notif_one_unread_per_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='notif_user_updated_id_idx'),
+            models.Index(fields=['user', 'read_at'], name='notif_user_read_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"Notification for {self.user}"
@@ -28,3 +46,12 @@ class Notification(models.Model):
     @property
     def is_read(self) -> bool:
         return self.read_at is not None
+
+
+class NotificationCounter(models.Model):
+    """A user's unread notification count, kept in step by ``notifications.utils``."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.unread} unread for {self.user}"
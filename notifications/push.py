@@ -0,0 +1,79 @@
+"""Events published to the live stream after the writing transaction commits.
+
+Nothing is computed or serialised for a channel nobody is subscribed to, so
+write paths pay only a dictionary lookup while no client is connected.
+"""
+from django.db import transaction
+
+from fine_payments.models import FinePayment
+from library_management_system.db import on_commit_once
+from return_extensions.models import ReturnExtensionRequest
+from transactions.models import BookIssue
+
+from .broker import ADMIN_CHANNEL, get_broker, user_channel
+from .models import NotificationCounter
+
+
+def notification_event(notification):
+    return {
+        'type': 'notification',
+        'id': notification.pk,
+        'message': notification.message,
+        'category': notification.category,
+        'target_url': str(notification.target_url),
+        'occurrences': notification.occurrences,
+        'created_at': notification.created_at.isoformat() if notification.created_at else None,
+        'updated_at': notification.updated_at.isoformat() if notification.updated_at else None,
+    }
+
+
+def unread_event(user_id):
+    unread = NotificationCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first()
+    return {'type': 'unread', 'count': unread or 0}
+
+
+def admin_counts():
+    """Work waiting for the library staff."""
+    return {
+        'pending_requests': BookIssue.objects.filter(status=BookIssue.STATUS_REQUESTED).count(),
+        'pending_extensions': ReturnExtensionRequest.objects.filter(status=ReturnExtensionRequest.STATUS_PENDING).count(),
+        'pending_payments': FinePayment.objects.filter(status=FinePayment.STATUS_PENDING).count(),
+    }
+
+
+def queues_event():
+    return {'type': 'queues', **admin_counts()}
+
+
+def publish_notifications(notifications):
+    """Push new notifications, and the recipients' unread counts, once committed."""
+    def publish():
+        broker = get_broker()
+        recipients = set()
+        for notification in notifications:
+            channel = user_channel(notification.user_id)
+            if broker.has_subscribers(channel):
+                broker.publish(channel, notification_event(notification))
+                recipients.add(notification.user_id)
+        for user_id in recipients:
+            broker.publish(user_channel(user_id), unread_event(user_id))
+    transaction.on_commit(publish)
+
+
+def publish_unread(user_id):
+    def publish():
+        broker = get_broker()
+        if broker.has_subscribers(user_channel(user_id)):
+            broker.publish(user_channel(user_id), unread_event(user_id))
+    transaction.on_commit(publish)
+
+
+def _publish_admin_counts():
+    broker = get_broker()
+    if broker.has_subscribers(ADMIN_CHANNEL):
+        broker.publish(ADMIN_CHANNEL, queues_event())
+
+
+def publish_admin_counts():
+    """Push the staff queue counts once the transaction commits, once however many changes it made."""
+    on_commit_once('admin_counts', _publish_admin_counts)
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fine_payments.models import FinePayment
+from return_extensions.models import ReturnExtensionRequest
+from transactions.signals import circulation_event_recorded
+
+from .push import publish_admin_counts
+
+# Every circulation change is pushed, not only the ones that move a count, so
+# staff dashboards refresh their other figures (loans, overdue, fines) too.
+@receiver(circulation_event_recorded)
+def circulation_changed(sender, event, **kwargs):
+    publish_admin_counts()
+
+
+@receiver([post_save, post_delete], sender=ReturnExtensionRequest)
+@receiver([post_save, post_delete], sender=FinePayment)
+def pending_requests_changed(sender, **kwargs):
+    publish_admin_counts()
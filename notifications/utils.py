@@ -1,13 +1,227 @@
-from datetime import datetime
+"""Writing notifications and keeping the unread counters in step.
 
-from .models import Notification
+``NotificationCounter`` holds each user's unread count so badges are a
+primary-key lookup. Every insert made through this module increments it and
+every read marking decrements it, with ``F()`` expressions in the same
+transaction. Counters are created on first use from a recount. Rows changed
+any other way (admin edits, cascades) are fixed by ``repair_unread_counters``.
+
+A notification with a ``coalesce_key`` folds into the user's unread one with
+the same category and key (keeping the newest text and counting
+``occurrences``), so repeated reminders do not add rows. New notifications
+and count changes are pushed to connected clients through
+``notifications.push``.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Notification, NotificationCounter
+from .push import publish_notifications, publish_unread
+
+NOTIFY_BATCH_SIZE = 1000
+COALESCE_ATTEMPTS = 3
+
+
+def _unread_in_db(user_ids):
+    rows = (
+        Notification.objects.filter(user_id__in=user_ids, read_at__isnull=True)
+        .values('user_id').annotate(count=Count('id')).order_by()
+    )
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update((row['user_id'], row['count']) for row in rows)
+    return counts
+
+
+def _add_unread(counts):
+    """Add ``{user_id: n}`` to the counters, creating missing ones from a recount."""
+    by_step = {}
+    for user_id, step in counts.items():
+        by_step.setdefault(step, []).append(user_id)
+    for step, user_ids in by_step.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(unread=Greatest(F('unread') + step, 0))
+    missing = set(counts) - set(NotificationCounter.objects.filter(user_id__in=counts).values_list('user_id', flat=True))
+    if missing:
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id, unread=count) for user_id, count in _unread_in_db(missing).items()],
+            ignore_conflicts=True,
+        )
+
+
+def _lock_unread(keyed):
+    """Lock the unread rows the keyed notifications fold into: ``{key: (pk, occurrences, created_at)}``."""
+    rows = (
+        Notification.objects.select_for_update().filter(
+            read_at__isnull=True, user_id__in={key[0] for key in keyed},
+            coalesce_key__in={key[2] for key in keyed},
+        ).order_by('id').values_list('id', 'user_id', 'category', 'coalesce_key', 'occurrences', 'created_at')
+    )
+    return {
+        (user_id, category, coalesce_key): (pk, occurrences, created_at)
+        for pk, user_id, category, coalesce_key, occurrences, created_at in rows
+        if (user_id, category, coalesce_key) in keyed
+    }
+
+
+def _write(notifications, batch_size):
+    """Insert ``notifications``, folding keyed ones into existing unread rows.
+
+    The rows folded into are locked first, so they cannot be marked read
+    underneath the update. Keyed inserts go in a savepoint: if a concurrent
+    writer inserted the same key first, the unique constraint rejects them and
+    they are folded into its row instead. Returns ``(created, updated)``.
+    """
+    keyed = {}
+    for notification in notifications:
+        if notification.coalesce_key:
+            key = (notification.user_id, notification.category, notification.coalesce_key)
+            if key in keyed:
+                # Several in one batch: keep the latest text, count them all.
+                notification.occurrences += keyed[key].occurrences
+            keyed[key] = notification
+    created = [notification for notification in notifications if not notification.coalesce_key]
+    Notification.objects.bulk_create(created, batch_size=batch_size)
+
+    now = timezone.now()
+    for notification in keyed.values():
+        notification.updated_at = now
+    updated = []
+    for attempt in range(COALESCE_ATTEMPTS):
+        existing = _lock_unread(keyed) if keyed else {}
+        inserts = []
+        for key, notification in keyed.items():
+            if key in existing:
+                notification.pk, occurrences, notification.created_at = existing[key]
+                notification.occurrences += occurrences
+                updated.append(notification)
+            else:
+                inserts.append(notification)
+        try:
+            with transaction.atomic():
+                Notification.objects.bulk_create(inserts, batch_size=batch_size)
+        except IntegrityError:
+            if attempt == COALESCE_ATTEMPTS - 1:
+                raise
+            for notification in inserts:
+                notification.pk, notification._state.adding = None, True
+            # Another writer inserted some of these keys first; fold into its rows.
+            keyed = {key: notification for key, notification in keyed.items() if key not in existing}
+            continue
+        created += inserts
+        break
+    Notification.objects.bulk_update(updated, ['message', 'target_url', 'occurrences', 'updated_at'],
+                                     batch_size=batch_size)
+    return created, updated
+
+
+class NotificationBatch:
+    """Collects notifications and writes them with chunked ``bulk_create``.
+
+    Use it as a context manager: rows are written every ``batch_size`` adds and
+    on a clean exit. On an exception the unwritten rows are dropped.
+    """
+
+    def __init__(self, batch_size=NOTIFY_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.pending = []
+        self.sent = 0
+
+    def add(self, user, message, target_url='', category='general', coalesce_key=''):
+        """Queue a notification for ``user`` (a user or a user id).
+
+        With a ``coalesce_key`` it replaces the user's unread notification with
+        the same category and key, counting the occurrence, instead of adding one.
+        """
+        user_id = getattr(user, 'pk', user)
+        self.pending.append(Notification(user_id=user_id, message=message, target_url=target_url,
+                                         category=category, coalesce_key=coalesce_key))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with transaction.atomic():
+                created, updated = _write(self.pending, self.batch_size)
+                _add_unread(Counter(notification.user_id for notification in created))
+                publish_notifications(created + updated)
+            self.sent += len(self.pending)
+            self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+
+def notify_many(batch_size=NOTIFY_BATCH_SIZE):
+    """``with notify_many() as batch: batch.add(user, message, ...)`` for batch jobs and loops."""
+    return NotificationBatch(batch_size)
 
 
 def notify_user(user, message, target_url='', category='general'):
-    Notification.objects.create(user=user, message=message, target_url=target_url, category=category)
+    with notify_many() as batch:
+        batch.add(user, message, target_url=target_url, category=category)
 
 
 def mark_notification_read(notification):
-    if not notification.read_at:
-        notification.read_at = datetime.now()
-        notification.save(update_fields=['read_at'])
+    """Mark one notification read; returns False if it already was."""
+    read_at = timezone.now()
+    with transaction.atomic():
+        if not Notification.objects.filter(pk=notification.pk, read_at__isnull=True).update(read_at=read_at):
+            return False
+        _add_unread({notification.user_id: -1})
+        publish_unread(notification.user_id)
+    notification.read_at = read_at
+    return True
+
+
+def mark_all_read(user):
+    """Mark all of the user's notifications read. Returns the number marked."""
+    with transaction.atomic():
+        marked = Notification.objects.filter(user=user, read_at__isnull=True).update(read_at=timezone.now())
+        if marked:
+            _add_unread({user.pk: -marked})
+            publish_unread(user.pk)
+    return marked
+
+
+def unread_count(user):
+    """The user's unread count, from the counter row."""
+    count = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread', flat=True).first()
+    if count is None:
+        _add_unread({user.pk: 0})
+        count = NotificationCounter.objects.filter(user_id=user.pk).values_list('unread', flat=True).first() or 0
+    return count
+
+
+def repair_unread_counters(fix=True):
+    """Recount every user's unread notifications; returns ``[(user_id, stored, actual)]`` that drifted.
+
+    With ``fix=True`` the drifted counters are corrected (and missing ones created).
+    """
+    actual = {
+        row['user_id']: row['count']
+        for row in Notification.objects.filter(read_at__isnull=True).values('user_id').annotate(count=Count('id')).order_by()
+    }
+    stored = dict(NotificationCounter.objects.values_list('user_id', 'unread'))
+    drifted = [
+        (user_id, stored.get(user_id), actual.get(user_id, 0))
+        for user_id in set(actual) | set(stored)
+        if stored.get(user_id) != actual.get(user_id, 0)
+    ]
+    if fix and drifted:
+        user_ids = [user_id for user_id, _, _ in drifted]
+        with transaction.atomic():
+            # Lock the counters and recount under the lock so concurrent writes are not lost.
+            list(NotificationCounter.objects.select_for_update().filter(user_id__in=user_ids).values_list('user_id'))
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(user_id=user_id, unread=count) for user_id, count in _unread_in_db(user_ids).items()],
+                update_conflicts=True, unique_fields=['user'], update_fields=['unread'], batch_size=NOTIFY_BATCH_SIZE,
+            )
+    return sorted(drifted)
@@ -1,23 +1,38 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.paginator import Paginator
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils import timezone
 
+from . import push, utils
+from .broker import ADMIN_CHANNEL, get_broker, user_channel
 from .models import Notification
 
+STREAM_KEEPALIVE_SECONDS = 15
+# Django 4.2 does not notice a client disconnecting mid-stream, so each stream
+# ends after a while and EventSource reconnects, resuming from Last-Event-ID.
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 3000
+STREAM_REPLAY_LIMIT = 50
+LIST_PAGE_SIZE = 50
+
 
 @login_required
 def notification_list(request):
-    notifications = Notification.objects.filter(user=request.user)
-    return render(request, 'notifications/list.html', {'notifications': notifications})
+    notifications = Notification.objects.filter(user=request.user).order_by('-updated_at', '-id')
+    paginator = Paginator(notifications, LIST_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'notifications/list.html', {'notifications': page_obj, 'page_obj': page_obj})
 
 
 @login_required
 def mark_read(request, pk):
     notification = get_object_or_404(Notification, pk=pk, user=request.user)
-    if not notification.read_at:
-        notification.read_at = timezone.now()
-        notification.save(update_fields=['read_at'])
+    utils.mark_notification_read(notification)
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'ok': True})
     return redirect('notifications:list')
@@ -25,7 +40,7 @@ def mark_read(request, pk):
 
 @login_required
 def mark_all_read(request):
-    Notification.objects.filter(user=request.user, read_at__isnull=True).update(read_at=timezone.now())
+    utils.mark_all_read(request.user)
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'ok': True})
     return redirect('notifications:list')
@@ -33,5 +48,63 @@ def mark_all_read(request):
 
 @login_required
 def unread_count(request):
-    count = Notification.objects.filter(user=request.user, read_at__isnull=True).count()
-    return JsonResponse({'count': count})
+    return JsonResponse({'count': utils.unread_count(request.user)})
+
+
+def _sse(event):
+    lines = [f"event: {event['type']}"]
+    if event['type'] == 'notification':
+        lines.append(f"id: {event['id']}")
+    lines.append(f'data: {json.dumps(event)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _stream_viewer(request):
+    user = request.user
+    if not user.is_authenticated:
+        return None, False
+    profile = getattr(user, 'profile', None)
+    return user, bool(profile and (profile.is_admin or profile.is_owner))
+
+
+def _stream_snapshot(user, is_staff, last_event_id):
+    events = []
+    if last_event_id is not None:
+        missed = Notification.objects.filter(user=user, pk__gt=last_event_id).order_by('-id')[:STREAM_REPLAY_LIMIT]
+        events.extend(push.notification_event(notification) for notification in reversed(missed))
+    events.append(push.unread_event(user.pk))
+    if is_staff:
+        events.append(push.queues_event())
+    return events
+
+
+async def _stream(user, is_staff, last_event_id):
+    subscription = get_broker().subscribe([user_channel(user.pk)] + ([ADMIN_CHANNEL] if is_staff else []))
+    try:
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        # Subscribed first, so nothing published while the snapshot loads is lost.
+        for event in await sync_to_async(_stream_snapshot)(user, is_staff, last_event_id):
+            yield _sse(event)
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                event = await asyncio.wait_for(subscription.get(), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield _sse(event)
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """Server-Sent Events: new notifications and unread counts, plus staff queue counts for admins."""
+    user, is_staff = await sync_to_async(_stream_viewer)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    response = StreamingHttpResponse(_stream(user, is_staff, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -4,16 +4,17 @@ from django.shortcuts import render
 from accounts.decorators import role_required
 from accounts.models import UserProfile
 from reservations.models import Reservation
+from reservations.queue import attach_positions
 from reviews.models import Review
-from transactions.models import BookIssue, Fine
+from transactions.archive import issue_history, user_fines
 
 
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def dashboard(request):
-    issues = BookIssue.objects.filter(user=request.user).select_related('book').order_by('-created_at')[:5]
-    reservations = Reservation.objects.filter(user=request.user).select_related('book').order_by('-created_at')[:5]
-    fines = Fine.objects.filter(issue__user=request.user).select_related('issue__book').order_by('-created_at')[:5]
+    issues = issue_history(request.user, limit=5)
+    reservations = attach_positions(Reservation.objects.filter(user=request.user).select_related('book').order_by('-created_at')[:5])
+    fines = user_fines(request.user).select_related('issue__book', 'archived_issue__book').order_by('-created_at')[:5]
     reviews = Review.objects.filter(user=request.user).select_related('book').order_by('-created_at')[:5]
     return render(
         request,
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import BookCoBorrow
+
+
+@admin.register(BookCoBorrow)
+class BookCoBorrowAdmin(admin.ModelAdmin):
+    list_display = ('book', 'other', 'readers', 'score')
+    raw_id_fields = ('book', 'other')
+    search_fields = ('book__title', 'other__title')
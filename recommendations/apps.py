@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class RecommendationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'recommendations'
+    verbose_name = 'Book Recommendations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
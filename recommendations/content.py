@@ -0,0 +1,275 @@
+"""Content-based "similar books" index.
+
+Each book becomes a hashed bag-of-words vector over its title, author,
+category and description, TF-IDF weighted and L2 normalised, so the dot
+product of two vectors is their cosine similarity. ``build_similarity_index``
+computes all vectors in one vectorised pass and writes them as plain ``.npy``
+arrays: a row-major CSR copy (to fetch a book's vector) and a feature-major
+postings copy (to score only the books sharing a feature). Readers open them
+memory-mapped, so worker processes share the pages.
+
+Books saved after the build are re-vectorised against the stored IDF into a
+small per-process overlay that takes precedence over the files. Changes are
+detected via the catalog version, checked at most every ``REFRESH_INTERVAL``
+seconds. Circulation and ratings touch ``updated_at`` as well, so each book's
+text is also stored as a CRC32 and only books whose text hash differs enter
+the overlay. Author/category renames are only picked up by the next build.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - fallback if numpy missing
+    np = None
+
+from books.caching import BOOK, catalog_versions
+from books.models import Book
+
+N_FEATURES = 1 << 18
+REFRESH_INTERVAL = 30
+FIELD_WEIGHTS = (3.0, 2.0, 1.5, 1.0)  # title, author, category, description
+BOOK_TEXT_FIELDS = ('id', 'title', 'author__name', 'category__name', 'description')
+ARRAYS = (
+    'book_ids', 'indptr', 'indices', 'data', 'post_indptr', 'post_rows', 'post_data', 'idf', 'text_hashes',
+)
+
+_TOKEN_RE = re.compile(r'[^\W\d_]{2,}', re.UNICODE)
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in into is it its of on or that the their this to was '
+    'were which will with'.split()
+)
+
+
+def _term_weights(texts):
+    """Hashed feature -> field-weighted term count for one book."""
+    counts = Counter()
+    for text, weight in zip(texts, FIELD_WEIGHTS):
+        for token in _TOKEN_RE.findall((text or '').lower()):
+            if token not in STOP_WORDS:
+                counts[zlib.crc32(token.encode('utf-8')) % N_FEATURES] += weight
+    return counts
+
+
+def _text_hash(texts):
+    return zlib.crc32('\x1f'.join(text or '' for text in texts).encode('utf-8'))
+
+
+def _index_dir():
+    return Path(settings.SIMILARITY_INDEX_DIR)
+
+
+def build_similarity_index(directory=None):
+    """Vectorise the whole catalog and publish a new index build. Returns the book count."""
+    if np is None:
+        raise RuntimeError('NumPy is required to build the similarity index')
+    directory = Path(directory or _index_dir())
+    built_at = timezone.now()
+
+    book_ids, text_hashes, indptr, indices, weights = [], [], [0], [], []
+    for row in Book.objects.values_list(*BOOK_TEXT_FIELDS).order_by('id').iterator(chunk_size=5000):
+        terms = _term_weights(row[1:])
+        book_ids.append(row[0])
+        text_hashes.append(_text_hash(row[1:]))
+        indices.extend(terms.keys())
+        weights.extend(terms.values())
+        indptr.append(len(indices))
+
+    count = len(book_ids)
+    book_ids = np.asarray(book_ids, dtype=np.int64)
+    indptr = np.asarray(indptr, dtype=np.int64)
+    indices = np.asarray(indices, dtype=np.int32)
+    weights = np.asarray(weights, dtype=np.float32)
+
+    document_frequency = np.bincount(indices, minlength=N_FEATURES)
+    idf = (np.log((1.0 + count) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    data = np.log1p(weights) * idf[indices]
+    row_of = np.repeat(np.arange(count, dtype=np.int32), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=count))
+    data = (data / np.where(norms > 0, norms, 1.0)[row_of]).astype(np.float32)
+
+    order = np.argsort(indices, kind='stable')
+    post_indptr = np.concatenate(([0], np.cumsum(document_frequency))).astype(np.int64)
+    arrays = {
+        'book_ids': book_ids, 'indptr': indptr, 'indices': indices, 'data': data,
+        'post_indptr': post_indptr, 'post_rows': row_of[order], 'post_data': data[order], 'idf': idf,
+        'text_hashes': np.asarray(text_hashes, dtype=np.uint32),
+    }
+
+    # Publish atomically: write a new build directory, then repoint CURRENT at it.
+    build = directory / built_at.strftime('%Y%m%d%H%M%S%f')
+    build.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(build / f'{name}.npy', array)
+    (build / 'meta.json').write_text(json.dumps({'built_at': built_at.isoformat(), 'books': count}))
+    pointer = directory / 'CURRENT.tmp'
+    pointer.write_text(build.name)
+    os.replace(pointer, directory / 'CURRENT')
+
+    for old in sorted(path for path in directory.iterdir() if path.is_dir() and path.name != build.name)[:-1]:
+        shutil.rmtree(old, ignore_errors=True)
+    return count
+
+
+class ContentIndex:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._build = None
+        self._arrays = None
+        self._overlay = {}
+        self._overlay_hashes = {}
+        self._overlay_arrays = None
+        self._synced_at = None
+        self._versions = None
+        self._checked = 0.0
+
+    # Loading and refreshing ---------------------------------------------
+
+    def _load(self):
+        directory = Path(self.directory or _index_dir())
+        try:
+            build = (directory / 'CURRENT').read_text().strip()
+        except FileNotFoundError:
+            return False
+        if build != self._build:
+            path = directory / build
+            meta = json.loads((path / 'meta.json').read_text())
+            self._arrays = {name: np.load(path / f'{name}.npy', mmap_mode='r') for name in ARRAYS}
+            self._build = build
+            self._overlay = {}
+            self._overlay_hashes = {}
+            self._overlay_arrays = None
+            self._synced_at = parse_datetime(meta['built_at'])
+            self._versions = None
+        return True
+
+    def _vector(self, texts):
+        terms = _term_weights(texts)
+        if not terms:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        indices = np.fromiter(terms.keys(), dtype=np.int32, count=len(terms))
+        data = np.log1p(np.fromiter(terms.values(), dtype=np.float32, count=len(terms))) * self._arrays['idf'][indices]
+        norm = np.sqrt(np.dot(data, data))
+        return indices, (data / norm if norm else data).astype(np.float32)
+
+    def _refresh_overlay(self):
+        versions = catalog_versions((BOOK,))
+        if versions == self._versions:
+            return
+        self._versions = versions
+        synced_at = timezone.now()
+        touched = Book.objects.filter(updated_at__gte=self._synced_at).values_list(*BOOK_TEXT_FIELDS)
+        added = False
+        for row in touched.iterator(chunk_size=2000):
+            text_hash = _text_hash(row[1:])
+            if text_hash != self._indexed_hash(row[0]):
+                self._overlay[row[0]] = self._vector(row[1:])
+                self._overlay_hashes[row[0]] = text_hash
+                added = True
+        self._synced_at = synced_at
+
+        # Flatten the overlay so it can be scored in one vectorised pass as well.
+        if added:
+            ids = np.fromiter(self._overlay, dtype=np.int64, count=len(self._overlay))
+            vectors = list(self._overlay.values())
+            lengths = [len(features) for features, _ in vectors]
+            base_ids = self._arrays['book_ids']
+            positions = np.minimum(np.searchsorted(base_ids, ids), max(len(base_ids) - 1, 0))
+            self._overlay_arrays = {
+                'ids': ids,
+                'rows': np.repeat(np.arange(len(ids)), lengths),
+                'indices': np.concatenate([features for features, _ in vectors]),
+                'data': np.concatenate([weights for _, weights in vectors]),
+                'stale': positions[base_ids[positions] == ids] if len(base_ids) else positions[:0],
+            }
+
+    def _indexed_hash(self, book_id):
+        """Hash of the text the book is currently indexed with, or None for a book added since the build."""
+        if book_id in self._overlay_hashes:
+            return self._overlay_hashes[book_id]
+        book_ids = self._arrays['book_ids']
+        row = int(np.searchsorted(book_ids, book_id))
+        if row < len(book_ids) and book_ids[row] == book_id:
+            return int(self._arrays['text_hashes'][row])
+        return None
+
+    def ensure_current(self):
+        if np is None:
+            return False
+        if self._build is not None and time.monotonic() - self._checked < REFRESH_INTERVAL:
+            return True
+        with self._lock:
+            if not self._load():
+                return False
+            self._checked = time.monotonic()
+            self._refresh_overlay()
+        return True
+
+    # Queries -----------------------------------------------------------
+
+    def vector(self, book_id):
+        if book_id in self._overlay:
+            return self._overlay[book_id]
+        arrays = self._arrays
+        row = int(np.searchsorted(arrays['book_ids'], book_id))
+        if row >= len(arrays['book_ids']) or arrays['book_ids'][row] != book_id:
+            return None
+        start, end = arrays['indptr'][row], arrays['indptr'][row + 1]
+        return np.asarray(arrays['indices'][start:end]), np.asarray(arrays['data'][start:end])
+
+    def similar(self, book_id, limit=10):
+        """``[(book_id, score), ...]`` most similar to ``book_id``, best first."""
+        if not self.ensure_current():
+            return []
+        vector = self.vector(book_id)
+        if vector is None or not len(vector[0]):
+            return []
+        features, weights = vector
+        arrays = self._arrays
+
+        # Gather the postings of every feature in the query vector at once.
+        starts = arrays['post_indptr'][features]
+        lengths = arrays['post_indptr'][features + 1] - starts
+        total = int(lengths.sum())
+        scores = {}
+        if total:
+            offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(total)
+            row_scores = np.bincount(
+                arrays['post_rows'][offsets],
+                weights=arrays['post_data'][offsets] * np.repeat(weights, lengths),
+                minlength=len(arrays['book_ids']),
+            )
+            if self._overlay_arrays is not None:
+                # Books in the overlay are scored from their fresh vectors below.
+                row_scores[self._overlay_arrays['stale']] = 0
+            candidates = min(limit + 1, int(np.count_nonzero(row_scores)))
+            if candidates:
+                top = np.argpartition(-row_scores, candidates - 1)[:candidates]
+                scores = {int(arrays['book_ids'][row]): float(row_scores[row]) for row in top if row_scores[row] > 0}
+
+        overlay = self._overlay_arrays
+        if overlay is not None:
+            query = np.zeros(N_FEATURES, dtype=np.float32)
+            query[features] = weights
+            overlay_scores = np.bincount(overlay['rows'], weights=overlay['data'] * query[overlay['indices']],
+                                         minlength=len(overlay['ids']))
+            for row in np.flatnonzero(overlay_scores > 0):
+                scores[int(overlay['ids'][row])] = float(overlay_scores[row])
+
+        scores.pop(book_id, None)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+index = ContentIndex()
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recommendations.utils import TOP_K, build_co_borrow_table
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the "also borrowed" co-borrow table from issue history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='Similar books kept per book')
+        parser.add_argument('--min-readers', type=int, default=1, help='Ignore pairs borrowed together by fewer users')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        books, pairs = build_co_borrow_table(top_k=options['top_k'], min_readers=options['min_readers'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {pairs} co-borrow pairs for {books} books in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.content import build_similarity_index, np
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the content-based "similar books" index files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', help='Index directory (default: settings.SIMILARITY_INDEX_DIR)')
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError('NumPy is required to build the similarity index.')
+        started = time.monotonic()
+        count = build_similarity_index(options['directory'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} books in {time.monotonic() - started:.1f}s'
+        ))
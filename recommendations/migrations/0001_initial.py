@@ -0,0 +1,40 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('books', '0005_catalogversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookBorrowStats',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='borrow_stats', serialize=False, to='books.book')),
+                ('borrowers', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BookCoBorrow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('readers', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_borrows', to='books.book')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='books.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['book', '-score'], name='coborrow_book_score_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bookcoborrow',
+            constraint=models.UniqueConstraint(fields=('book', 'other'), name='coborrow_book_other_uniq'),
+        ),
+    ]
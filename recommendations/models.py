@@ -0,0 +1,35 @@
+from django.db import models
+
+from books.models import Book
+
+
+class BookBorrowStats(models.Model):
+    """Number of distinct users who have borrowed a book."""
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='borrow_stats')
+    borrowers = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.book_id}: {self.borrowers} borrowers"
+
+
+class BookCoBorrow(models.Model):
+    """Users who borrowed ``book`` and also ``other``, kept for the top pairs per book.
+
+    ``score`` is the cosine similarity readers / sqrt(borrowers(book) * borrowers(other)).
+    Each pair is stored in both directions so serving is one indexed range scan.
+    """
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='co_borrows')
+    other = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    readers = models.PositiveIntegerField(default=0)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'other'], name='coborrow_book_other_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['book', '-score'], name='coborrow_book_score_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.book_id} -> {self.other_id} ({self.readers})"
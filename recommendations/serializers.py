@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from books.serializers import BookSerializer
+
+from .models import BookCoBorrow
+
+
+class CoBorrowSerializer(serializers.ModelSerializer):
+    book = BookSerializer(source='other', read_only=True)
+
+    class Meta:
+        model = BookCoBorrow
+        fields = ['book', 'readers', 'score']
@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from transactions.signals import book_issued
+
+from .utils import record_borrow
+
+
+@receiver(book_issued)
+def count_co_borrows(sender, issue, **kwargs):
+    # After commit: a failure here must not undo the issue, and the counters
+    # should not be locked for as long as the circulation transaction runs.
+    transaction.on_commit(partial(record_borrow, issue.user_id, issue.book_id), robust=True)
@@ -0,0 +1,156 @@
+"""Co-borrowing ("readers who borrowed this also borrowed") similarity.
+
+``build_co_borrow_table`` recomputes everything offline from BookIssue history
+(live and archived): the user x book borrow matrix is multiplied by itself with
+SciPy sparse arithmetic and only the ``top_k`` most similar books per book are
+stored.
+``record_borrow`` folds each newly issued book into the stored counts so the
+table stays current between rebuilds, pruning each book back to its top-k. A
+pair that was pruned restarts from the new borrow only, until the next rebuild.
+"""
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Cast, Coalesce, RowNumber, Sqrt
+from scipy import sparse
+
+from transactions.models import BookIssue, BookIssueArchive
+
+from .models import BookBorrowStats, BookCoBorrow
+
+TOP_K = 20
+WRITE_BATCH_SIZE = 5000
+BORROWED_STATUSES = (BookIssue.STATUS_ISSUED, BookIssue.STATUS_RETURNED)
+
+
+def borrow_pairs():
+    """Distinct (user_id, book_id) for books that were actually issued, live or archived."""
+    live = BookIssue.objects.filter(status__in=BORROWED_STATUSES).values_list('user_id', 'book_id').order_by()
+    archived = (
+        BookIssueArchive.objects.filter(status=BookIssue.STATUS_RETURNED)
+        .values_list('user_id', 'book_id').order_by()
+    )
+    return live.union(archived)
+
+
+def _co_borrow(pairs, top_k, min_readers):
+    data = np.fromiter(chain.from_iterable(pairs), dtype=np.int64).reshape(-1, 2)
+    if not len(data):
+        return {}, []
+    user_ids, user_index = np.unique(data[:, 0], return_inverse=True)
+    book_ids, book_index = np.unique(data[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(data), dtype=np.int32), (user_index, book_index)),
+        shape=(len(user_ids), len(book_ids)),
+    )
+    borrowers = np.asarray(matrix.sum(axis=0)).ravel()
+    co = (matrix.T @ matrix).tocoo()
+
+    keep = (co.row != co.col) & (co.data >= min_readers)
+    rows, cols, readers = co.row[keep], co.col[keep], co.data[keep]
+    scores = readers / np.sqrt(borrowers[rows].astype(np.float64) * borrowers[cols])
+
+    # Group by book, best score first, then keep the first top_k of each group.
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, readers, scores = rows[order], cols[order], readers[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+    top = rank < top_k
+
+    stats = dict(zip(book_ids.tolist(), borrowers.tolist()))
+    return stats, list(zip(
+        book_ids[rows[top]].tolist(), book_ids[cols[top]].tolist(), readers[top].tolist(), scores[top].tolist()
+    ))
+
+
+def build_co_borrow_table(top_k=TOP_K, min_readers=1):
+    """Rebuild borrower counts and the top-k co-borrow table from scratch.
+
+    Returns ``(books, pairs)`` written.
+    """
+    pairs = borrow_pairs().iterator(chunk_size=20000)
+    stats, rows = _co_borrow(pairs, top_k, min_readers)
+
+    with transaction.atomic():
+        BookBorrowStats.objects.all().delete()
+        BookCoBorrow.objects.all().delete()
+        BookBorrowStats.objects.bulk_create(
+            [BookBorrowStats(book_id=book_id, borrowers=count) for book_id, count in stats.items()],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+        BookCoBorrow.objects.bulk_create(
+            [BookCoBorrow(book_id=book_id, other_id=other, readers=readers, score=score)
+             for book_id, other, readers, score in rows],
+            batch_size=WRITE_BATCH_SIZE,
+        )
+    return len(stats), len(rows)
+
+
+def _borrowers(column):
+    return Coalesce(
+        Subquery(BookBorrowStats.objects.filter(book_id=OuterRef(column)).values('borrowers')[:1]), Value(1),
+    )
+
+
+def _rescore(book_id):
+    """Recompute the scores of the book's pairs, in both directions, after its borrower count changed."""
+    count = BookBorrowStats.objects.filter(book_id=book_id).values_list('borrowers', flat=True).first() or 1
+    readers = Cast(F('readers'), FloatField())
+    BookCoBorrow.objects.filter(book_id=book_id).update(
+        score=readers / Sqrt(Cast(_borrowers('other_id') * count, FloatField())))
+    BookCoBorrow.objects.filter(other_id=book_id).update(
+        score=readers / Sqrt(Cast(_borrowers('book_id') * count, FloatField())))
+
+
+def _prune(book_ids, top_k):
+    """Drop the pairs ranked below ``top_k`` for each of ``book_ids``."""
+    rank = Window(RowNumber(), partition_by=[F('book_id')], order_by=[F('score').desc(), F('other_id').asc()])
+    beyond = list(
+        BookCoBorrow.objects.filter(book_id__in=book_ids).annotate(rank=rank)
+        .filter(rank__gt=top_k).values_list('id', flat=True)
+    )
+    if beyond:
+        BookCoBorrow.objects.filter(id__in=beyond).delete()
+
+
+def record_borrow(user_id, book_id, top_k=TOP_K):
+    """Count a newly issued book: its borrower total and its pairs with the user's other books.
+
+    Run after the issue commits (see ``signals``), so it holds no circulation
+    locks. The rows are created with ``ignore_conflicts`` and then incremented,
+    so concurrent first borrows of a book or pair cannot collide; the books
+    whose pair lists grew are pruned back to ``top_k``.
+    """
+    borrowed = BookIssue.objects.filter(user_id=user_id, status__in=BORROWED_STATUSES)
+    archived = BookIssueArchive.objects.filter(user_id=user_id, status=BookIssue.STATUS_RETURNED)
+    if borrowed.filter(book_id=book_id).count() > 1 or archived.filter(book_id=book_id).exists():
+        # The user has borrowed this book before, so nothing changes.
+        return
+    others = sorted(
+        set(borrowed.exclude(book_id=book_id).values_list('book_id', flat=True).order_by())
+        | set(archived.values_list('book_id', flat=True).order_by())
+    )
+
+    with transaction.atomic():
+        BookBorrowStats.objects.bulk_create([BookBorrowStats(book_id=book_id)], ignore_conflicts=True)
+        BookBorrowStats.objects.filter(book_id=book_id).update(borrowers=F('borrowers') + 1)
+        if others:
+            new_pairs = [(book_id, other) for other in others] + [(other, book_id) for other in others]
+            BookCoBorrow.objects.bulk_create(
+                [BookCoBorrow(book_id=source, other_id=target) for source, target in new_pairs],
+                ignore_conflicts=True, batch_size=WRITE_BATCH_SIZE,
+            )
+            pairs = Q(book_id=book_id, other_id__in=others) | Q(book_id__in=others, other_id=book_id)
+            BookCoBorrow.objects.filter(pairs).update(readers=F('readers') + 1)
+        _rescore(book_id)
+        if others:
+            _prune([book_id, *others], top_k)
+
+
+def also_borrowed(book_id, limit=10):
+    return (
+        BookCoBorrow.objects.filter(book_id=book_id)
+        .select_related('other__author', 'other__category')
+        .order_by('-score')[:limit]
+    )
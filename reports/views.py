@@ -120,15 +120,15 @@ def export_issued_csv(request):
 @role_required(UserProfile.ROLE_ADMIN)
 def export_overdue_csv(request):
     issues = BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED, due_date__lt=date.today())
-    rows = [(i.book.title, i.user.username, i.due_date) for i in issues]
-    return _csv_response('overdue_books.csv', rows, ['Book', 'User', 'Due Date'])
+    rows = issues.order_by('-fine_accrued').values_list('book__title', 'user__username', 'due_date', 'fine_accrued')
+    return _csv_response('overdue_books.csv', rows, ['Book', 'User', 'Due Date', 'Fine Accrued'])
 
 
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def export_fines_csv(request):
-    fines = Fine.objects.select_related('issue__book', 'issue__user')
-    rows = [(f.issue.book.title, f.issue.user.username, f.amount, f.paid, f.created_at) for f in fines]
+    fines = Fine.objects.select_related('issue__book', 'issue__user', 'archived_issue__book', 'archived_issue__user')
+    rows = [(f.loan.book.title, f.loan.user.username, f.amount, f.paid, f.created_at) for f in fines]
     return _csv_response('fines.csv', rows, ['Book', 'User', 'Amount', 'Paid', 'Created'])
 
 
@@ -1,6 +1,14 @@
+from django.db import transaction
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from books.models import Book
+
+from .eta import book_waits, reservation_etas
 from .models import Reservation
-from .serializers import ReservationSerializer
+from .queue import attach_positions, release_copies
+from .serializers import ReservationListSerializer, ReservationSerializer, reservation_list_queryset
+from books.serializers import wants_compact
 
 class ReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.all()
@@ -10,5 +18,57 @@ class ReservationViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user_profile = self.request.user.profile
         if user_profile.is_admin or user_profile.is_owner:
-            return Reservation.objects.all()
-        return Reservation.objects.filter(user=self.request.user)
+            queryset = Reservation.objects.all()
+        else:
+            queryset = Reservation.objects.filter(user=self.request.user)
+        if self.action == 'list' and wants_compact(self.request):
+            return reservation_list_queryset(queryset)
+        return queryset.select_related('book__author', 'book__category', 'user')
+
+    def get_serializer_class(self):
+        if self.action == 'list' and wants_compact(self.request):
+            return ReservationListSerializer
+        return super().get_serializer_class()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        return attach_positions(page) if page is not None else None
+
+    def get_object(self):
+        return attach_positions([super().get_object()])[0]
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            held = Reservation.objects.filter(pk=instance.pk, holds_copy=True).update(holds_copy=False)
+            instance.delete()
+            if held:
+                release_copies(instance.book_id)
+
+    @action(detail=True, methods=['get'])
+    def eta(self, request, pk=None):
+        """Expected date a copy becomes available for this queued reservation."""
+        reservation = self.get_object()
+        book_id, position, eta = reservation_etas([reservation.book_id]).get(reservation.pk, (reservation.book_id, None, None))
+        return Response({'id': reservation.pk, 'book_id': book_id, 'position': position, 'eta': eta})
+
+    @action(detail=False, methods=['get'])
+    def etas(self, request):
+        """ETAs of the caller's queued reservations; admins get every queue and a per-book wait summary."""
+        user_profile = request.user.profile
+        is_staff = user_profile.is_admin or user_profile.is_owner
+        if is_staff:
+            etas = reservation_etas()
+        else:
+            own = dict(Reservation.objects.filter(user=request.user, status=Reservation.STATUS_QUEUED).values_list('id', 'book_id'))
+            etas = {pk: value for pk, value in reservation_etas(set(own.values())).items() if pk in own} if own else {}
+        data = {
+            'results': [
+                {'id': pk, 'book_id': book_id, 'position': position, 'eta': eta}
+                for pk, (book_id, position, eta) in etas.items()
+            ],
+        }
+        if is_staff:
+            books = book_waits(etas)
+            titles = dict(Book.objects.filter(pk__in=[row['book_id'] for row in books]).values_list('id', 'title'))
+            data['books'] = [{**row, 'title': titles.get(row['book_id'])} for row in books]
+        return Response(data)
@@ -0,0 +1,122 @@
+"""Expected availability dates for queued reservations.
+
+For each book, the dates its copies become free form a min-heap: shelf copies
+are free today, issued copies on their due date (today if overdue). The queue
+is walked in order; each reservation takes the earliest free copy, and that
+copy is pushed back after the time the reservation is expected to keep it. A
+holder who picks the copy up keeps it for a loan period; one who does not
+keeps it until the hold expires. The expected time is weighted by the
+historical pickup rate, i.e. the share of closed holds that were fulfilled.
+
+Copies already held for a reservation are not counted: they are spoken for.
+"""
+import heapq
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from books.models import Book
+from system_settings.utils import get_setting_value
+from transactions.models import BookIssue
+
+from .models import Reservation
+from .queue import QUEUE_ORDER
+
+PICKUP_HISTORY_DAYS = 180
+DEFAULT_PICKUP_RATE = 1.0
+
+
+def pickup_rate(today=None):
+    """Share of holds closed in the last ``PICKUP_HISTORY_DAYS`` that ended in an issue."""
+    since = (today or date.today()) - timedelta(days=PICKUP_HISTORY_DAYS)
+    closed = Reservation.objects.filter(
+        approved_at__date__gte=since,
+        status__in=[Reservation.STATUS_FULFILLED, Reservation.STATUS_EXPIRED, Reservation.STATUS_CANCELLED],
+    ).aggregate(total=Count('id'), fulfilled=Count('id', filter=Q(status=Reservation.STATUS_FULFILLED)))
+    if not closed['total']:
+        return DEFAULT_PICKUP_RATE
+    return closed['fulfilled'] / closed['total']
+
+
+def occupancy_days(rate):
+    """Expected days a queued reservation keeps the copy it is given."""
+    loan_days = int(get_setting_value('max_issue_days', default=settings.ISSUE_DURATION_DAYS))
+    hold_days = int(get_setting_value('reservation_expiry_days', default=3))
+    return max(1, round(rate * loan_days + (1 - rate) * hold_days))
+
+
+def queue_etas(free_dates, queue, occupancy):
+    """``[(reservation_id, eta), ...]`` for ``queue`` (ids in queue order) given the copies' free dates.
+
+    ``eta`` is None when the book has no copies in circulation.
+    """
+    heap = list(free_dates)
+    heapq.heapify(heap)
+    etas = []
+    for reservation_id in queue:
+        if not heap:
+            etas.append((reservation_id, None))
+            continue
+        free_on = heapq.heappop(heap)
+        etas.append((reservation_id, free_on))
+        heapq.heappush(heap, free_on + timedelta(days=occupancy))
+    return etas
+
+
+def reservation_etas(book_ids=None, today=None):
+    """ETAs of every queued reservation (of ``book_ids``, if given) in one pass.
+
+    Returns ``{reservation_id: (book_id, position, eta)}``.
+    """
+    today = today or date.today()
+    occupancy = occupancy_days(pickup_rate(today))
+
+    queued = Reservation.objects.filter(status=Reservation.STATUS_QUEUED)
+    if book_ids is not None:
+        queued = queued.filter(book_id__in=book_ids)
+    queues = {}
+    for reservation_id, book_id in queued.order_by('book_id', *QUEUE_ORDER).values_list('id', 'book_id'):
+        queues.setdefault(book_id, []).append(reservation_id)
+    if not queues:
+        return {}
+
+    free_dates = {
+        book_id: [today] * available
+        for book_id, available in Book.objects.filter(pk__in=queues).values_list('id', 'available_count')
+    }
+    issued = BookIssue.objects.filter(book_id__in=queues, status=BookIssue.STATUS_ISSUED)
+    for book_id, due_date in issued.values_list('book_id', 'due_date').iterator(chunk_size=5000):
+        free_dates[book_id].append(max(due_date or today, today))
+
+    etas = {}
+    for book_id, queue in queues.items():
+        for position, (reservation_id, eta) in enumerate(queue_etas(free_dates.get(book_id, ()), queue, occupancy), 1):
+            etas[reservation_id] = (book_id, position, eta)
+    return etas
+
+
+def attach_etas(reservations, today=None):
+    """Set ``eta`` on the queued ones among loaded reservations. Returns them."""
+    reservations = list(reservations)
+    queued = [r for r in reservations if r.status == Reservation.STATUS_QUEUED]
+    etas = reservation_etas({r.book_id for r in queued}, today) if queued else {}
+    for reservation in queued:
+        reservation.eta = etas.get(reservation.pk, (None, None, None))[2]
+    return reservations
+
+
+def book_waits(etas, today=None):
+    """Per-book queue length and expected wait of the last in line.
+
+    Books with no copies in circulation come first, then the longest waits.
+    """
+    today = today or date.today()
+    books = {}
+    for book_id, position, eta in etas.values():
+        summary = books.setdefault(book_id, {'book_id': book_id, 'queued': 0, 'last_eta': None, 'wait_days': None})
+        summary['queued'] = max(summary['queued'], position)
+        if eta is not None and (summary['last_eta'] is None or eta > summary['last_eta']):
+            summary['last_eta'] = eta
+            summary['wait_days'] = (eta - today).days
+    return sorted(books.values(), key=lambda row: (row['wait_days'] is not None, -(row['wait_days'] or 0)))
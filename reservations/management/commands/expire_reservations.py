@@ -1,20 +1,14 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 
-from reservations.models import Reservation
-from notifications.utils import notify_user
+from reservations.queue import EXPIRE_BATCH_SIZE, expire_due
 
 
 class Command(BaseCommand):
     help = 'Expire reservations past their expiry time'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=EXPIRE_BATCH_SIZE)
+
     def handle(self, *args, **options):
-        now = timezone.now()
-        expired = Reservation.objects.filter(status__in=[Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED], expires_at__lt=now)
-        count = 0
-        for res in expired:
-            res.status = Reservation.STATUS_EXPIRED
-            res.save(update_fields=['status'])
-            notify_user(res.user, f"Your reservation for '{res.book.title}' expired.", category='reservation')
-            count += 1
+        count = expire_due(batch_size=options['batch_size'])
         self.stdout.write(self.style.SUCCESS(f'Expired {count} reservations'))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+
+def cancel_duplicate_active(apps, schema_editor):
+    # The new constraint allows one active reservation per user and book; keep the oldest.
+    Reservation = apps.get_model('reservations', 'Reservation')
+    seen = set()
+    duplicates = []
+    active = Reservation.objects.filter(status__in=['QUEUED', 'APPROVED']).order_by('created_at', 'id')
+    for pk, book_id, user_id in active.values_list('id', 'book_id', 'user_id').iterator():
+        if (book_id, user_id) in seen:
+            duplicates.append(pk)
+        seen.add((book_id, user_id))
+    Reservation.objects.filter(id__in=duplicates).update(status='CANCELLED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='reservation',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='reservation',
+            name='resv_book_status_pos_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='reservation',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['book', 'status', 'created_at'], name='resv_book_status_created_idx'),
+        ),
+        migrations.RunPython(cancel_duplicate_active, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'APPROVED'])), fields=('book', 'user'), name='resv_one_active_per_user'),
+        ),
+        migrations.RemoveField(
+            model_name='reservation',
+            name='position',
+        ),
+    ]
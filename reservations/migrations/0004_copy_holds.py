@@ -0,0 +1,23 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_derived_queue_positions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='holds_copy',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='reservation',
+            name='status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('APPROVED', 'Approved'), ('CANCELLED', 'Cancelled'), ('EXPIRED', 'Expired'), ('FULFILLED', 'Fulfilled')], default='QUEUED', max_length=20),
+        ),
+    ]
@@ -14,32 +14,54 @@ class Reservation(models.Model):
     STATUS_APPROVED = 'APPROVED'
     STATUS_CANCELLED = 'CANCELLED'
     STATUS_EXPIRED = 'EXPIRED'
+    STATUS_FULFILLED = 'FULFILLED'
 
     STATUS_CHOICES = [
         (STATUS_QUEUED, 'Queued'),
         (STATUS_APPROVED, 'Approved'),
         (STATUS_CANCELLED, 'Cancelled'),
         (STATUS_EXPIRED, 'Expired'),
+        (STATUS_FULFILLED, 'Fulfilled'),
     ]
 
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='reservations')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reservations')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
-    position = models.PositiveIntegerField(default=1)
+    holds_copy = models.BooleanField(default=False)
     expires_at = models.DateTimeField(blank=True, null=True)
     approved_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['position', 'created_at']
-        unique_together = ('book', 'user', 'status')
+        ordering = ['created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['book', 'user'], condition=models.Q(status__in=['QUEUED', 'APPROVED']),
+                name='resv_one_active_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['book', 'status', 'created_at'], name='resv_book_status_created_idx'),
+            models.Index(fields=['status', 'expires_at'], name='resv_status_expires_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"Reservation {self.book.title} for {self.user.username}"
 
-    def set_expiry(self):
+    @staticmethod
+    def expiry_from_now():
         days = int(get_setting_value('reservation_expiry_days', default=3))
-        self.expires_at = timezone.now() + timedelta(days=days)
+        return timezone.now() + timedelta(days=days)
+
+    def set_expiry(self):
+        self.expires_at = self.expiry_from_now()
+
+    @property
+    def position(self):
+        """Place in the book's queue, when loaded by ``reservations.queue``; None otherwise."""
+        if self.status != self.STATUS_QUEUED:
+            return None
+        return getattr(self, 'queue_position', None)
 
     @property
     def is_active(self):
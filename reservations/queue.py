@@ -0,0 +1,201 @@
+"""Reservation waitlists.
+
+A book's queue is its ``QUEUED`` reservations in ``(created_at, id)`` order.
+Positions are not stored: they are ranked on read with a ``ROW_NUMBER()``
+window over the book's queue. Joining, leaving or being promoted out of the
+queue is therefore a single INSERT or conditional UPDATE, and never rewrites
+the rows behind it.
+
+A user holds at most one active (queued or approved) reservation per book,
+enforced by the ``resv_one_active_per_user`` constraint, so concurrent
+requests cannot enqueue the same user twice.
+
+A copy freed by a return (or by a hold that is cancelled or expires) goes to
+the head of the book's queue in the same transaction: the reservation is
+approved with ``holds_copy`` set and the copy stays off the shelf until the
+holder's issue is approved, which marks the reservation ``FULFILLED``. Copies
+nobody is queued for go back to ``available_count``.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Window
+from django.db.models.functions import Least, RowNumber
+from django.utils import timezone
+
+from books.caching import BOOK, bump_catalog_version
+from books.models import Book
+from notifications.utils import notify_many
+
+from .models import Reservation
+
+QUEUE_ORDER = ('created_at', 'id')
+EXPIRE_BATCH_SIZE = 500
+ACTIVE_STATUSES = (Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED)
+
+
+class QueueError(Exception):
+    """The queue action does not apply to the reservation's current state."""
+
+
+def _rank(*partition_by):
+    return Window(RowNumber(), partition_by=[F(name) for name in partition_by],
+                  order_by=[F(name).asc() for name in QUEUE_ORDER])
+
+
+def with_positions(queryset):
+    """Annotate ``queue_position`` on a queryset holding whole queues.
+
+    The window only sees the rows the queryset selects, so filter by book (or
+    not at all), never by user; use ``attach_positions`` for anything else.
+    """
+    return queryset.annotate(queue_position=_rank('book_id', 'status'))
+
+
+def attach_positions(reservations):
+    """Set ``queue_position`` on loaded reservations with one ranking query. Returns them."""
+    reservations = list(reservations)
+    queued = {r.pk: r for r in reservations if r.status == Reservation.STATUS_QUEUED}
+    if queued:
+        book_ids = {r.book_id for r in queued.values()}
+        ranked = (
+            Reservation.objects.filter(book_id__in=book_ids, status=Reservation.STATUS_QUEUED)
+            .annotate(queue_position=_rank('book_id')).order_by().values_list('id', 'queue_position')
+        )
+        for pk, position in ranked:
+            if pk in queued:
+                queued[pk].queue_position = position
+    return reservations
+
+
+def queue_length(book):
+    return Reservation.objects.filter(book=book, status=Reservation.STATUS_QUEUED).count()
+
+
+def next_in_queue(book):
+    return Reservation.objects.filter(book=book, status=Reservation.STATUS_QUEUED).order_by(*QUEUE_ORDER).first()
+
+
+def enqueue(user, book):
+    """Add ``user`` to the end of ``book``'s queue.
+
+    Raises ``QueueError`` if the user already has an active reservation for it.
+    """
+    reservation = Reservation(book=book, user=user)
+    reservation.set_expiry()
+    try:
+        with transaction.atomic():
+            reservation.save()
+    except IntegrityError:
+        raise QueueError('You already have a reservation for this book.')
+    return reservation
+
+
+def _transition(reservation, from_statuses, holding=None, **changes):
+    rows = Reservation.objects.filter(pk=reservation.pk, status__in=from_statuses)
+    if holding is not None:
+        rows = rows.filter(holds_copy=holding)
+    if not rows.update(**changes):
+        return False
+    for name, value in changes.items():
+        setattr(reservation, name, value)
+    return True
+
+
+def cancel(reservation):
+    """Withdraw a queued or approved reservation; the rest of the queue moves up implicitly.
+
+    A copy held for it passes to the next reservation in the queue.
+    """
+    status = Reservation.STATUS_CANCELLED
+    with transaction.atomic():
+        if _transition(reservation, (Reservation.STATUS_APPROVED,), holding=True, status=status, holds_copy=False):
+            release_copies(reservation.book_id)
+        elif not _transition(reservation, ACTIVE_STATUSES, status=status):
+            raise QueueError('Reservation is no longer active.')
+    return reservation
+
+
+def expire_due(now=None, batch_size=EXPIRE_BATCH_SIZE):
+    """Expire every active reservation past ``expires_at``, one short transaction per batch.
+
+    Each batch locks its rows (skipping rows another run holds), expires them
+    with one UPDATE, writes the notifications in bulk and passes the
+    held copies on per book. Safe to run concurrently and as often as wanted.
+    Returns the number expired.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Reservation.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(status__in=ACTIVE_STATUSES, expires_at__lt=now).order_by('id')
+                .values_list('id', 'user_id', 'book_id', 'holds_copy', 'book__title')[:batch_size]
+            )
+            if not rows:
+                return expired
+            Reservation.objects.filter(id__in=[row[0] for row in rows]).update(
+                status=Reservation.STATUS_EXPIRED, holds_copy=False)
+            with notify_many() as batch:
+                for _, user_id, _, _, title in rows:
+                    batch.add(user_id, f"Your reservation for '{title}' expired.", category='reservation')
+            for book_id, count in Counter(row[2] for row in rows if row[3]).items():
+                release_copies(book_id, count)
+        expired += len(rows)
+
+
+def promote(reservation):
+    """Approve a queued reservation, taking it out of the queue and restarting its expiry."""
+    reservation.set_expiry()
+    if not _transition(reservation, (Reservation.STATUS_QUEUED,), status=Reservation.STATUS_APPROVED,
+                       approved_at=timezone.now(), expires_at=reservation.expires_at):
+        raise QueueError('Reservation is not queued.')
+    return reservation
+
+
+def _allocate(book_id, count):
+    heads = list(
+        Reservation.objects.select_for_update(skip_locked=True)
+        .filter(book_id=book_id, status=Reservation.STATUS_QUEUED)
+        .exclude(expires_at__lt=timezone.now())  # left for expire_due
+        .order_by(*QUEUE_ORDER).values_list('id', flat=True)[:count]
+    )
+    if not heads:
+        return []
+    Reservation.objects.filter(pk__in=heads, status=Reservation.STATUS_QUEUED).update(
+        status=Reservation.STATUS_APPROVED, holds_copy=True,
+        approved_at=timezone.now(), expires_at=Reservation.expiry_from_now())
+    held = list(Reservation.objects.filter(pk__in=heads, holds_copy=True).select_related('book'))
+    with notify_many() as batch:
+        for reservation in held:
+            expires_at = timezone.localtime(reservation.expires_at)
+            batch.add(reservation.user_id, f"A copy of '{reservation.book.title}' is being held for you until "
+                      f"{expires_at:%Y-%m-%d %H:%M}.", category='reservation')
+    return held
+
+
+def release_copies(book_id, count=1):
+    """Hand ``count`` freed copies of a book to the head of its queue; the rest go back on the shelf.
+
+    Must run inside the transaction that frees the copies. Returns the reservations now holding a copy.
+    """
+    held = _allocate(book_id, count)
+    if count > len(held):
+        Book.objects.filter(pk=book_id).update(
+            available_count=Least(F('available_count') + (count - len(held)), F('quantity')),
+            updated_at=timezone.now())
+        bump_catalog_version(BOOK)
+    return held
+
+
+def fulfil(user_id, book_id):
+    """Close the user's active reservation for a book being issued to them.
+
+    Returns True if it was holding a copy, which the issue then takes instead of a shelf copy.
+    """
+    active = Reservation.objects.filter(user_id=user_id, book_id=book_id, status__in=ACTIVE_STATUSES)
+    if active.filter(holds_copy=True).update(status=Reservation.STATUS_FULFILLED, holds_copy=False):
+        return True
+    active.update(status=Reservation.STATUS_FULFILLED)
+    return False
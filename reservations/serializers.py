@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Reservation
+from .queue import QueueError, enqueue
 from books.serializers import BookSerializer
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -13,10 +14,43 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = [
             'id', 'book', 'book_id', 'user', 'user_username', 'status', 
-            'position', 'expires_at', 'approved_at', 'created_at'
+            'position', 'holds_copy', 'expires_at', 'approved_at', 'created_at'
         ]
-        read_only_fields = ['status', 'user', 'position', 'expires_at', 'approved_at']
+        read_only_fields = ['status', 'user', 'holds_copy', 'expires_at', 'approved_at']
 
     def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            return enqueue(self.context['request'].user, validated_data['book'])
+        except QueueError as exc:
+            raise serializers.ValidationError({'detail': str(exc)})
+
+    def update(self, instance, validated_data):
+        # A reservation belongs to its book's queue (and may hold one of its copies);
+        # moving to another book means cancelling and reserving that one.
+        book = validated_data.pop('book', instance.book)
+        if book.pk != instance.book_id:
+            raise serializers.ValidationError({'book_id': 'The book of a reservation cannot be changed.'})
+        return super().update(instance, validated_data)
+
+
+class ReservationListSerializer(serializers.ModelSerializer):
+    """Flat row for ``?compact=true`` reservation lists; pair with ``reservation_list_queryset``."""
+    book_title = serializers.CharField(source='book.title', read_only=True)
+    author_name = serializers.CharField(source='book.author.name', read_only=True)
+    user_username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = [
+            'id', 'book_id', 'book_title', 'author_name', 'user', 'user_username', 'status',
+            'position', 'holds_copy', 'expires_at', 'approved_at', 'created_at',
+        ]
+        read_only_fields = fields
+
+
+def reservation_list_queryset(queryset):
+    """Load the columns ``ReservationListSerializer`` reads, joined in one query."""
+    return queryset.select_related('book__author', 'user').only(
+        'id', 'book_id', 'user_id', 'status', 'holds_copy', 'expires_at', 'approved_at', 'created_at',
+        'book__title', 'book__author__name', 'user__username',
+    )
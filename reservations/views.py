@@ -1,23 +1,15 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils import timezone
 
 from accounts.decorators import role_required
 from accounts.models import UserProfile
 from books.models import Book
 from notifications.utils import notify_user
 
+from .eta import attach_etas
 from .models import Reservation
-
-
-def _resequence(book):
-    queue = Reservation.objects.filter(book=book, status=Reservation.STATUS_QUEUED).order_by('created_at')
-    for idx, res in enumerate(queue, start=1):
-        if res.position != idx:
-            res.position = idx
-            res.save(update_fields=['position'])
+from .queue import ACTIVE_STATUSES, QueueError, attach_positions, cancel, enqueue, promote, with_positions
 
 
 @login_required
@@ -28,16 +20,11 @@ def create_reservation(request, book_id):
         messages.info(request, 'Book is available to issue, no reservation needed.')
         return redirect('books:list')
 
-    existing_active = Reservation.objects.filter(book=book, user=request.user, status__in=[Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED]).exists()
-    if existing_active:
-        messages.warning(request, 'You already have a reservation for this book.')
+    try:
+        enqueue(request.user, book)
+    except QueueError as exc:
+        messages.warning(request, str(exc))
         return redirect('reservations:my-reservations')
-
-    with transaction.atomic():
-        position = Reservation.objects.filter(book=book, status=Reservation.STATUS_QUEUED).count() + 1
-        reservation = Reservation.objects.create(book=book, user=request.user, position=position)
-        reservation.set_expiry()
-        reservation.save(update_fields=['expires_at'])
     messages.success(request, 'Reservation placed. You will be notified when approved.')
     return redirect('reservations:my-reservations')
 
@@ -45,18 +32,19 @@ def create_reservation(request, book_id):
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def my_reservations(request):
-    reservations = Reservation.objects.filter(user=request.user).select_related('book').order_by('status', 'position')
+    reservations = attach_etas(attach_positions(Reservation.objects.filter(user=request.user).select_related('book').order_by('status', '-created_at')))
     return render(request, 'reservations/my_list.html', {'reservations': reservations})
 
 
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def cancel_reservation(request, pk):
-    reservation = get_object_or_404(Reservation, pk=pk, user=request.user, status__in=[Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED])
-    book = reservation.book
-    reservation.status = Reservation.STATUS_CANCELLED
-    reservation.save(update_fields=['status'])
-    _resequence(book)
+    reservation = get_object_or_404(Reservation, pk=pk, user=request.user, status__in=ACTIVE_STATUSES)
+    try:
+        cancel(reservation)
+    except QueueError as exc:
+        messages.warning(request, str(exc))
+        return redirect('reservations:my-reservations')
     messages.info(request, 'Reservation cancelled.')
     return redirect('reservations:my-reservations')
 
@@ -64,18 +52,19 @@ def cancel_reservation(request, pk):
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def admin_list(request):
-    reservations = Reservation.objects.select_related('book', 'user').order_by('book__title', 'position')
+    reservations = with_positions(Reservation.objects.select_related('book', 'user')).order_by('book__title', 'status', 'created_at', 'id')
     return render(request, 'reservations/admin_list.html', {'reservations': reservations})
 
 
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def approve_reservation(request, pk):
-    reservation = get_object_or_404(Reservation, pk=pk, status=Reservation.STATUS_QUEUED)
-    reservation.status = Reservation.STATUS_APPROVED
-    reservation.approved_at = timezone.now()
-    reservation.set_expiry()
-    reservation.save(update_fields=['status', 'approved_at', 'expires_at'])
+    reservation = get_object_or_404(Reservation.objects.select_related('book', 'user'), pk=pk, status=Reservation.STATUS_QUEUED)
+    try:
+        promote(reservation)
+    except QueueError as exc:
+        messages.warning(request, str(exc))
+        return redirect('reservations:admin-list')
     notify_user(reservation.user, f"Your reservation for '{reservation.book.title}' has been approved.", target_url='', category='reservation')
     messages.success(request, 'Reservation approved.')
     return redirect('reservations:admin-list')
@@ -84,10 +73,11 @@ def approve_reservation(request, pk):
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def cancel_admin(request, pk):
-    reservation = get_object_or_404(Reservation, pk=pk, status__in=[Reservation.STATUS_QUEUED, Reservation.STATUS_APPROVED])
-    book = reservation.book
-    reservation.status = Reservation.STATUS_CANCELLED
-    reservation.save(update_fields=['status'])
-    _resequence(book)
+    reservation = get_object_or_404(Reservation, pk=pk, status__in=ACTIVE_STATUSES)
+    try:
+        cancel(reservation)
+    except QueueError as exc:
+        messages.warning(request, str(exc))
+        return redirect('reservations:admin-list')
     messages.info(request, 'Reservation cancelled.')
     return redirect('reservations:admin-list')
@@ -1,11 +1,14 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from .models import ReturnExtensionRequest
 from .serializers import ReturnExtensionRequestSerializer
-from transactions.models import BookIssue, Fine
+from transactions.events import record_event
+from transactions.fines import record_fine, refresh_issue_fine
+from transactions.models import BookIssue, CirculationEvent
 from notifications.utils import notify_user
 
 class ReturnExtensionViewSet(viewsets.ModelViewSet):
@@ -31,21 +34,21 @@ class ReturnExtensionViewSet(viewsets.ModelViewSet):
              return Response({'detail': 'Request not pending'}, status=status.HTTP_400_BAD_REQUEST)
 
         issue = req.issue
-        issue.due_date = (issue.due_date or timezone.now().date()) + timedelta(days=req.days_requested)
-        issue.save()
-        
-        req.status = ReturnExtensionRequest.STATUS_APPROVED
-        req.processed_by = request.user
-        req.processed_at = timezone.now()
-        req.save()
-        
-        # Recompute fine
-        fine_amount = issue.compute_fine()
-        if fine_amount > 0:
-            Fine.objects.update_or_create(issue=issue, defaults={'amount': fine_amount, 'paid': False})
-        else:
-             # Look for existing fine to clear/update? Logic might vary but let's stick to update_or_create
-             pass
+        with transaction.atomic():
+            issue.due_date = (issue.due_date or timezone.now().date()) + timedelta(days=req.days_requested)
+            issue.save()
+
+            req.status = ReturnExtensionRequest.STATUS_APPROVED
+            req.processed_by = request.user
+            req.processed_at = timezone.now()
+            req.save()
+            record_event(CirculationEvent.KIND_EXTENDED, issue, request_id=req.pk,
+                         days=req.days_requested, due_date=issue.due_date)
+
+            # Recompute fine
+            fine_amount = refresh_issue_fine(issue)
+            if fine_amount > 0:
+                record_fine(issue, fine_amount)
 
         notify_user(req.user, f"Your extension for '{issue.book.title}' was approved.", category='extension')
         return Response(self.get_serializer(req).data)
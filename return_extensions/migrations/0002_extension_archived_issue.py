@@ -0,0 +1,25 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_bookissuearchive'),
+        ('return_extensions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='returnextensionrequest',
+            name='archived_issue',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='extension_requests', to='transactions.bookissuearchive'),
+        ),
+        migrations.AlterField(
+            model_name='returnextensionrequest',
+            name='issue',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='extension_requests', to='transactions.bookissue'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 
-from transactions.models import BookIssue
+from transactions.models import BookIssue, BookIssueArchive
 
 
 class ReturnExtensionRequest(models.Model):
@@ -16,7 +16,13 @@ class ReturnExtensionRequest(models.Model):
         (STATUS_REJECTED, 'Rejected'),
     ]
 
-    issue = models.ForeignKey(BookIssue, on_delete=models.CASCADE, related_name='extension_requests')
+    # Moves from ``issue`` to ``archived_issue`` when the issue is archived.
+    issue = models.ForeignKey(
+        BookIssue, on_delete=models.SET_NULL, null=True, blank=True, related_name='extension_requests'
+    )
+    archived_issue = models.ForeignKey(
+        BookIssueArchive, on_delete=models.SET_NULL, null=True, blank=True, related_name='extension_requests'
+    )
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='extension_requests')
     days_requested = models.PositiveIntegerField()
     reason = models.TextField()
@@ -29,4 +35,9 @@ class ReturnExtensionRequest(models.Model):
         ordering = ['-created_at']
 
     def __str__(self) -> str:
-        return f"Extension {self.issue} ({self.status})"
+        return f"Extension {self.loan} ({self.status})"
+
+    @property
+    def loan(self):
+        """The live or archived issue this request was made for."""
+        return self.issue if self.issue_id else self.archived_issue
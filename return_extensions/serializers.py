@@ -2,18 +2,19 @@ from rest_framework import serializers
 from .models import ReturnExtensionRequest
 
 class ReturnExtensionRequestSerializer(serializers.ModelSerializer):
-    issue_book_title = serializers.CharField(source='issue.book.title', read_only=True)
+    issue_book_title = serializers.CharField(source='loan.book.title', read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
     processed_by_username = serializers.CharField(source='processed_by.username', read_only=True)
 
     class Meta:
         model = ReturnExtensionRequest
         fields = [
-            'id', 'issue', 'issue_book_title', 'user', 'user_username', 
+            'id', 'issue', 'archived_issue', 'issue_book_title', 'user', 'user_username', 
             'days_requested', 'reason', 'status', 
             'processed_by', 'processed_by_username', 'processed_at', 'created_at'
         ]
-        read_only_fields = ['user', 'status', 'processed_by', 'processed_at', 'created_at']
+        read_only_fields = ['user', 'archived_issue', 'status', 'processed_by', 'processed_at', 'created_at']
+        extra_kwargs = {'issue': {'required': True, 'allow_null': False}}
 
     def create(self, validated_data):
         user = self.context['request'].user
@@ -9,7 +9,9 @@ from django.utils import timezone
 from accounts.decorators import role_required
 from accounts.models import UserProfile
 from notifications.utils import notify_user
-from transactions.models import BookIssue, Fine
+from transactions.events import record_event
+from transactions.fines import record_fine, refresh_issue_fine
+from transactions.models import BookIssue, CirculationEvent
 
 from .forms import ReturnExtensionForm
 from .models import ReturnExtensionRequest
@@ -19,7 +21,7 @@ from .models import ReturnExtensionRequest
 @role_required(UserProfile.ROLE_STUDENT)
 def my_extensions(request):
     issues = BookIssue.objects.filter(user=request.user, status=BookIssue.STATUS_ISSUED).select_related('book')
-    requests_qs = ReturnExtensionRequest.objects.filter(user=request.user).select_related('issue__book')
+    requests_qs = ReturnExtensionRequest.objects.filter(user=request.user).select_related('issue__book', 'archived_issue__book')
     return render(request, 'return_extensions/my_list.html', {'issues': issues, 'requests': requests_qs})
 
 
@@ -45,7 +47,7 @@ def request_extension(request, issue_id):
 @login_required
 @role_required(UserProfile.ROLE_ADMIN)
 def admin_list(request):
-    reqs = ReturnExtensionRequest.objects.select_related('issue__book', 'user')
+    reqs = ReturnExtensionRequest.objects.select_related('issue__book', 'archived_issue__book', 'user')
     return render(request, 'return_extensions/admin_list.html', {'requests': reqs})
 
 
@@ -61,10 +63,11 @@ def approve_request(request, pk):
     req.processed_by = request.user
     req.processed_at = timezone.now()
     req.save(update_fields=['status', 'processed_by', 'processed_at'])
+    record_event(CirculationEvent.KIND_EXTENDED, issue, request_id=req.pk, days=req.days_requested, due_date=issue.due_date)
     # recompute fine if exists
-    fine_amount = issue.compute_fine()
+    fine_amount = refresh_issue_fine(issue)
     if fine_amount > 0:
-        Fine.objects.update_or_create(issue=issue, defaults={'amount': fine_amount, 'paid': False})
+        record_fine(issue, fine_amount)
     notify_user(req.user, f"Your extension for '{issue.book.title}' was approved.", category='extension')
     messages.success(request, 'Extension approved.')
     return redirect('return_extensions:admin-list')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from reviews.utils import rebuild_book_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored rating aggregates on every book from approved reviews'
+
+    def handle(self, *args, **options):
+        updated = rebuild_book_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {updated} books'))
@@ -30,3 +30,16 @@ class Review(models.Model):
 
     def __str__(self) -> str:
         return f"Review {self.rating} for {self.book.title} by {self.user.username}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this review contributed to the book's rating aggregates.
+        if {'book_id', 'rating', 'status'}.issubset(field_names):
+            instance._rating_state = instance.rating_state()
+        return instance
+
+    def rating_state(self):
+        if self.status == self.STATUS_APPROVED:
+            return (self.book_id, self.rating)
+        return None
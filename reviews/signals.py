@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.models import Book
+
+from .models import Review
+from .utils import rebuild_book_ratings, update_book_rating
+
+
+@receiver(post_save, sender=Review)
+def sync_book_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = instance.rating_state()
+    if created:
+        old = None
+    elif hasattr(instance, '_rating_state'):
+        old = instance._rating_state
+    else:
+        # Loaded with deferred fields: the previous contribution is unknown.
+        rebuild_book_ratings(Book.objects.filter(pk=instance.book_id))
+        instance._rating_state = new
+        return
+
+    if old != new:
+        if old and new and old[0] != new[0]:
+            update_book_rating(old[0], removed=old[1])
+            update_book_rating(new[0], added=new[1])
+        else:
+            update_book_rating((new or old)[0], removed=old and old[1], added=new and new[1])
+    instance._rating_state = new
+
+
+@receiver(post_delete, sender=Review)
+def drop_book_rating(sender, instance, **kwargs):
+    state = getattr(instance, '_rating_state', instance.rating_state())
+    if state:
+        update_book_rating(state[0], removed=state[1])
@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from books.caching import BOOK, bump_catalog_version
+from books.models import Book
+
+from .models import Review
+
+STARS = range(1, 6)
+
+
+def _average_expression():
+    total = sum((F(f'rating_{star}') * star for star in STARS), Value(0))
+    return Case(
+        When(rating_count=0, then=Value(0.0)),
+        default=Cast(total, FloatField()) / F('rating_count'),
+        output_field=FloatField(),
+    )
+
+
+def update_book_rating(book_id, removed=None, added=None):
+    """Move one approved rating in or out of a book's histogram.
+
+    ``removed``/``added`` are star values (or None). Runs as two UPDATE statements:
+    one for the histogram buckets and count, one to recompute the average from them.
+    """
+    if removed == added:
+        return
+    changes = {}
+    if removed:
+        changes[f'rating_{removed}'] = F(f'rating_{removed}') - 1
+    if added:
+        changes[f'rating_{added}'] = F(f'rating_{added}') + 1
+    if bool(added) != bool(removed):
+        changes['rating_count'] = F('rating_count') + (1 if added else -1)
+
+    books = Book.objects.filter(pk=book_id)
+    with transaction.atomic():
+        books.update(updated_at=timezone.now(), **changes)
+        books.update(avg_rating=_average_expression())
+        bump_catalog_version(BOOK)
+
+
+def rebuild_book_ratings(books=None):
+    """Recompute rating aggregates from approved reviews, set-based."""
+    books = Book.objects.all() if books is None else books
+    approved = Review.objects.filter(book=OuterRef('pk'), status=Review.STATUS_APPROVED)
+    buckets = {
+        f'rating_{star}': Coalesce(
+            Subquery(approved.filter(rating=star).values('book').annotate(c=Count('id')).values('c')),
+            0,
+        )
+        for star in STARS
+    }
+    with transaction.atomic():
+        books.update(**buckets)
+        books.update(rating_count=sum((F(f'rating_{star}') for star in STARS), Value(0)))
+        updated = books.update(avg_rating=_average_expression())
+        bump_catalog_version(BOOK)
+        return updated
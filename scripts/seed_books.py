@@ -1,4 +1,4 @@
-from books.models import Author, Category, Book
+from books.importer import CatalogImporter
 
 # Core seed data (title, author, category)
 data = [
@@ -104,20 +104,17 @@ while len(data) < 100:
     n = len(data) + 1
     data.append((f"Library Picks Vol {n}", "LMS Editorial", "General"))
 
-created = 0
-for idx, (title, author_name, category_name) in enumerate(data, start=1):
-    author, _ = Author.objects.get_or_create(name=author_name)
-    category, _ = Category.objects.get_or_create(name=category_name)
-    isbn = f"AUTO-{idx:04d}"
-    defaults = {
+records = [
+    {
+        "isbn": f"AUTO-{idx:04d}",
         "title": title,
-        "author": author,
-        "category": category,
+        "author": author_name,
+        "category": category_name,
         "quantity": 5,
         "available_count": 5,
-        "description": "",
     }
-    _, made = Book.objects.update_or_create(isbn=isbn, defaults=defaults)
-    created += 1 if made else 0
+    for idx, (title, author_name, category_name) in enumerate(data, start=1)
+]
 
-print(f"processed {len(data)} books; created {created}")
+importer = CatalogImporter(batch_size=500).run(records)
+print(f"processed {importer.rows} books; written {importer.written}")
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import BookIssue, Fine
+from .models import BookIssue, BookIssueArchive, Fine
 
 
 @admin.register(BookIssue)
@@ -10,8 +10,15 @@ class BookIssueAdmin(admin.ModelAdmin):
     search_fields = ('book__title', 'user__username')
 
 
+@admin.register(BookIssueArchive)
+class BookIssueArchiveAdmin(admin.ModelAdmin):
+    list_display = ('book', 'user', 'status', 'issue_date', 'due_date', 'return_date', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    search_fields = ('book__title', 'user__username')
+
+
 @admin.register(Fine)
 class FineAdmin(admin.ModelAdmin):
-    list_display = ('issue', 'amount', 'paid', 'created_at')
+    list_display = ('loan', 'amount', 'paid', 'created_at')
     list_filter = ('paid',)
     search_fields = ('issue__book__title', 'issue__user__username')
@@ -1,10 +1,21 @@
-from rest_framework import viewsets, permissions, status
+from decimal import Decimal, InvalidOperation
+
+from rest_framework import filters, viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
-from .models import BookIssue, Fine
-from .serializers import BookIssueSerializer, FineSerializer
+from .archive import user_fines
+from .circulation import CirculationError, approve_issue, reject_issue, return_issue, return_issues
+from .events import record_event
+from .models import BookIssue, BookIssueArchive, CirculationEvent, Fine
+from .serializers import (
+    BookIssueListSerializer, BookIssueSerializer, FineListSerializer, FineSerializer,
+    fine_list_queryset, issue_list_queryset,
+)
+from books.serializers import wants_compact
 from accounts.api_views import CsrfExemptSessionAuthentication
+from notifications.utils import notify_many
 from system_settings.utils import get_setting_value
 
 from django.utils.decorators import method_decorator
@@ -16,15 +27,50 @@ class BookIssueViewSet(viewsets.ModelViewSet):
     serializer_class = BookIssueSerializer
     authentication_classes = [CsrfExemptSessionAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['created_at', 'due_date', 'fine_accrued']
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         user_profile = self.request.user.profile
         if user_profile.is_admin or user_profile.is_owner:
-            return BookIssue.objects.all()
-        return BookIssue.objects.filter(user=self.request.user)
+            queryset = BookIssue.objects.all()
+        else:
+            queryset = BookIssue.objects.filter(user=self.request.user)
+        if self.action == 'list' and wants_compact(self.request):
+            queryset = issue_list_queryset(queryset)
+        else:
+            queryset = queryset.select_related('book__author', 'book__category', 'user__profile')
+        min_fine = self.request.query_params.get('min_fine')
+        if min_fine:
+            try:
+                queryset = queryset.filter(fine_accrued__gte=Decimal(min_fine))
+            except InvalidOperation:
+                pass
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list' and wants_compact(self.request):
+            return BookIssueListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user, status=BookIssue.STATUS_REQUESTED)
+        with transaction.atomic():
+            issue = serializer.save(user=self.request.user, status=BookIssue.STATUS_REQUESTED)
+            record_event(CirculationEvent.KIND_REQUESTED, issue)
+
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        """Closed issues moved to the archive table, newest first."""
+        user_profile = request.user.profile
+        queryset = BookIssueArchive.objects.select_related('book__author', 'book__category', 'user__profile')
+        if not (user_profile.is_admin or user_profile.is_owner):
+            queryset = queryset.filter(user=request.user)
+        queryset = queryset.order_by('-created_at', '-id')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(BookIssueSerializer(page, many=True, context=self.get_serializer_context()).data)
+        return Response(BookIssueSerializer(queryset, many=True, context=self.get_serializer_context()).data)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def approve(self, request, pk=None):
@@ -33,23 +79,14 @@ class BookIssueViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
             
         issue = self.get_object()
-        if issue.status != BookIssue.STATUS_REQUESTED:
-            return Response({'detail': 'Issue is not in requested state'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check availability
-        if issue.book.available_count < 1:
-            return Response({'detail': 'Book not available'}, status=status.HTTP_400_BAD_REQUEST)
-
-        issue.status = BookIssue.STATUS_ISSUED
-        issue.issue_date = timezone.now().date()
+        issue_date = timezone.now().date()
         # Calculate due date based on settings (simplified here)
-        issue.due_date = issue.issue_date + timezone.timedelta(days=int(get_setting_value('return_period_days', default=14)))
-        issue.save()
-        
-        # Decrement book count
-        issue.book.available_count -= 1
-        issue.book.save()
-        
+        due_date = issue_date + timezone.timedelta(days=int(get_setting_value('return_period_days', default=14)))
+        try:
+            approve_issue(issue, due_date, issue_date=issue_date)
+        except CirculationError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
         return Response(self.get_serializer(issue).data)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -59,11 +96,10 @@ class BookIssueViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
         issue = self.get_object()
-        if issue.status != BookIssue.STATUS_REQUESTED:
-            return Response({'detail': 'Issue is not in requested state'}, status=status.HTTP_400_BAD_REQUEST)
-
-        issue.status = BookIssue.STATUS_REJECTED
-        issue.save()
+        try:
+            reject_issue(issue)
+        except CirculationError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(self.get_serializer(issue).data)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
@@ -72,24 +108,33 @@ class BookIssueViewSet(viewsets.ModelViewSet):
         if not (user_profile.is_admin or user_profile.is_owner):
             return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         issue = self.get_object()
-        if issue.status != BookIssue.STATUS_ISSUED:
-            return Response({'detail': 'Book is not issued'}, status=status.HTTP_400_BAD_REQUEST)
-
-        issue.status = BookIssue.STATUS_RETURNED
-        issue.return_date = timezone.now().date()
-        issue.save()
-
-        # Increment book count
-        issue.book.available_count += 1
-        issue.book.save()
-        
-        # Calculate fine
-        fine_amount = issue.compute_fine()
-        if fine_amount > 0:
-            Fine.objects.create(issue=issue, amount=fine_amount)
+        try:
+            # Releases the copy and records any fine.
+            return_issue(issue, return_date=timezone.now().date())
+        except CirculationError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(self.get_serializer(issue).data)
 
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def bulk_return(self, request):
+        """Check in many issues at once: ``{"ids": [...]}``. Issues not currently issued are skipped."""
+        user_profile = request.user.profile
+        if not (user_profile.is_admin or user_profile.is_owner):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return Response({'detail': 'ids must be a list of issue ids'}, status=status.HTTP_400_BAD_REQUEST)
+        returned, fines = return_issues(BookIssue.objects.filter(pk__in=ids), return_date=timezone.now().date())
+        with notify_many() as batch:
+            for issue in returned:
+                batch.add(issue.user_id, f"'{issue.book.title}' was marked as returned.", category='issue')
+        return Response({
+            'returned': [issue.pk for issue in returned],
+            'skipped': sorted(set(ids) - {issue.pk for issue in returned}),
+            'fines': len(fines),
+        })
+
 class FineViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Fine.objects.all()
     serializer_class = FineSerializer
@@ -98,5 +143,17 @@ class FineViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         user_profile = self.request.user.profile
         if user_profile.is_admin or user_profile.is_owner:
-            return Fine.objects.all()
-        return Fine.objects.filter(issue__user=self.request.user)
+            queryset = Fine.objects.all()
+        else:
+            queryset = user_fines(self.request.user)
+        if self.action == 'list' and wants_compact(self.request):
+            return fine_list_queryset(queryset)
+        return queryset.select_related(
+            *[f'{relation}__{path}' for relation in ('issue', 'archived_issue')
+              for path in ('book__author', 'book__category', 'user__profile')]
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list' and wants_compact(self.request):
+            return FineListSerializer
+        return super().get_serializer_class()
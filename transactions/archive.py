@@ -0,0 +1,98 @@
+"""Archive tier for closed issues.
+
+Returned and rejected issues that have not changed for
+``settings.ISSUE_ARCHIVE_AFTER_DAYS`` are moved, in batches, from
+``BookIssue`` to ``BookIssueArchive`` (same id and columns), so the live table
+only holds recent and open circulation. Their fines and extension requests
+stay linked through ``archived_issue``. Issues with an unpaid fine or a
+pending extension request stay live.
+
+Read paths that cover a user's whole history or all-time statistics combine
+both tables with the helpers below.
+"""
+from collections import Counter
+from datetime import timedelta
+from itertools import chain
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from return_extensions.models import ReturnExtensionRequest
+
+from .models import BookIssue, BookIssueArchive, Fine
+
+ARCHIVE_BATCH_SIZE = 1000
+CLOSED_STATUSES = (BookIssue.STATUS_RETURNED, BookIssue.STATUS_REJECTED)
+ARCHIVED_FIELDS = (
+    'id', 'user_id', 'book_id', 'status', 'issue_date', 'due_date', 'return_date',
+    'fine_accrued', 'fine_accrued_on', 'created_at', 'updated_at',
+)
+
+
+def archivable_issues(older_than_days=None):
+    if older_than_days is None:
+        older_than_days = settings.ISSUE_ARCHIVE_AFTER_DAYS
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    # Subqueries, not joins: PostgreSQL refuses FOR UPDATE on the nullable side of an outer join.
+    unpaid_fine = Fine.objects.filter(issue=OuterRef('pk'), paid=False)
+    pending_extension = ReturnExtensionRequest.objects.filter(
+        issue=OuterRef('pk'), status=ReturnExtensionRequest.STATUS_PENDING)
+    return (
+        BookIssue.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+        .exclude(Exists(unpaid_fine))
+        .exclude(Exists(pending_extension))
+    )
+
+
+def archive_issues(older_than_days=None, batch_size=ARCHIVE_BATCH_SIZE, limit=None, progress=None):
+    """Move archivable issues to the archive table, one transaction per batch.
+
+    Returns the number of issues archived. ``progress(total)`` is called after each batch.
+    """
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        with transaction.atomic():
+            rows = list(
+                archivable_issues(older_than_days).select_for_update(of=('self',))
+                .order_by('id').values(*ARCHIVED_FIELDS)[:size]
+            )
+            if not rows:
+                break
+            ids = [row['id'] for row in rows]
+            BookIssueArchive.objects.bulk_create([BookIssueArchive(**row) for row in rows])
+            # The archive keeps the issue id, so the links can be moved in place.
+            Fine.objects.filter(issue_id__in=ids).update(archived_issue_id=F('issue_id'), issue=None)
+            ReturnExtensionRequest.objects.filter(issue_id__in=ids).update(
+                archived_issue_id=F('issue_id'), issue=None)
+            BookIssue.objects.filter(id__in=ids).delete()
+        archived += len(rows)
+        if progress:
+            progress(archived)
+    return archived
+
+
+def issue_history(user, limit=None):
+    """The user's live and archived issues, newest first, with book and fine loaded."""
+    live = BookIssue.objects.filter(user=user).select_related('book', 'fine').order_by('-created_at')
+    archived = BookIssueArchive.objects.filter(user=user).select_related('book', 'fine').order_by('-created_at')
+    if limit is not None:
+        live, archived = live[:limit], archived[:limit]
+    return sorted(chain(live, archived), key=attrgetter('created_at'), reverse=True)[:limit]
+
+
+def user_fines(user):
+    """Fines of the user's live and archived issues."""
+    return Fine.objects.filter(Q(issue__user=user) | Q(archived_issue__user=user))
+
+
+def merged_counts(field, live, archived):
+    """``Counter`` of ``field`` values over a live and an archive queryset (``field`` may be an annotation)."""
+    counts = Counter()
+    for queryset in (live, archived):
+        for row in queryset.values(field).annotate(count=Count('id')).order_by():
+            counts[row[field]] += row['count']
+    return counts
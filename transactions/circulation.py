@@ -0,0 +1,131 @@
+"""Issue/return state transitions.
+
+Every transition is a conditional UPDATE guarded on the current status, and
+stock moves with ``F()`` expressions guarded on availability, so concurrent
+desk actions can neither oversell copies nor apply a transition twice. Rows
+are only locked for the duration of those statements, not while Python code
+runs. Each action also appends a ``CirculationEvent`` in its transaction.
+
+Returned copies go to the book's reservation queue first (see
+``reservations.queue``); issuing a book to a reservation holder takes the copy
+held for them.
+"""
+from collections import Counter
+from datetime import date
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from books.caching import BOOK, bump_catalog_version
+from books.models import Book
+from reservations.queue import fulfil, release_copies
+
+from .events import record_event
+from .fines import record_fine, refresh_issue_fine
+from .models import BookIssue, CirculationEvent
+from .signals import book_issued
+
+
+class CirculationError(Exception):
+    """The transition does not apply to the issue's current state."""
+
+
+def _transition(issue, from_status, **changes):
+    changes['updated_at'] = timezone.now()
+    if not BookIssue.objects.filter(pk=issue.pk, status=from_status).update(**changes):
+        return False
+    for name, value in changes.items():
+        setattr(issue, name, value)
+    return True
+
+
+def _refresh_book(issue):
+    # Keep an already loaded issue.book in step with the UPDATE above.
+    if BookIssue.book.is_cached(issue):
+        issue.book.refresh_from_db(fields=['available_count', 'updated_at'])
+
+
+def approve_issue(issue, due_date, issue_date=None):
+    """Issue a requested book, taking the copy held for the user or else one available copy."""
+    if issue.status != BookIssue.STATUS_REQUESTED:
+        raise CirculationError('Issue is not in requested state')
+    issue_date = issue_date or date.today()
+    with transaction.atomic():
+        if not fulfil(issue.user_id, issue.book_id):
+            taken = Book.objects.filter(pk=issue.book_id, available_count__gt=0).update(
+                available_count=F('available_count') - 1, updated_at=timezone.now())
+            if not taken:
+                raise CirculationError('Book not available')
+        if not _transition(issue, BookIssue.STATUS_REQUESTED, status=BookIssue.STATUS_ISSUED,
+                           issue_date=issue_date, due_date=due_date):
+            # Rolls back the copy taken above.
+            raise CirculationError('Issue is not in requested state')
+        bump_catalog_version(BOOK)
+        record_event(CirculationEvent.KIND_ISSUED, issue, issue_date=issue_date, due_date=due_date)
+        book_issued.send(sender=BookIssue, issue=issue)
+    _refresh_book(issue)
+    return issue
+
+
+def reject_issue(issue):
+    with transaction.atomic():
+        if not _transition(issue, BookIssue.STATUS_REQUESTED, status=BookIssue.STATUS_REJECTED):
+            raise CirculationError('Issue is not in requested state')
+        record_event(CirculationEvent.KIND_REJECTED, issue)
+    return issue
+
+
+def request_issue(user, book):
+    """Create a pending issue request."""
+    with transaction.atomic():
+        issue = BookIssue.objects.create(user=user, book=book, status=BookIssue.STATUS_REQUESTED)
+        record_event(CirculationEvent.KIND_REQUESTED, issue)
+    return issue
+
+
+def return_issue(issue, return_date=None):
+    """Return an issued book, passing its copy to the next reservation and recording any fine.
+
+    Returns the ``Fine`` if one is due, else None.
+    """
+    with transaction.atomic():
+        if not _transition(issue, BookIssue.STATUS_ISSUED, status=BookIssue.STATUS_RETURNED,
+                           return_date=return_date or date.today()):
+            raise CirculationError('Book is not issued')
+        release_copies(issue.book_id)
+        _refresh_book(issue)
+        record_event(CirculationEvent.KIND_RETURNED, issue, return_date=issue.return_date)
+
+        fine_amount = refresh_issue_fine(issue)
+        if fine_amount > 0:
+            return record_fine(issue, fine_amount)
+    return None
+
+
+def return_issues(issues, return_date=None):
+    """Return many issued books at once (mass check-in).
+
+    Issues that are no longer issued are skipped. Freed copies are handed to
+    each book's queue in one step per book. Returns ``(returned, fines)``.
+    """
+    return_date = return_date or date.today()
+    with transaction.atomic():
+        returned = list(
+            BookIssue.objects.select_for_update(of=('self',)).select_related('book')
+            .filter(pk__in=[issue.pk for issue in issues], status=BookIssue.STATUS_ISSUED).order_by('id')
+        )
+        now = timezone.now()
+        BookIssue.objects.filter(pk__in=[issue.pk for issue in returned]).update(
+            status=BookIssue.STATUS_RETURNED, return_date=return_date, updated_at=now)
+        for book_id, count in Counter(issue.book_id for issue in returned).items():
+            release_copies(book_id, count)
+
+        fines = []
+        for issue in returned:
+            issue.status, issue.return_date, issue.updated_at = BookIssue.STATUS_RETURNED, return_date, now
+            record_event(CirculationEvent.KIND_RETURNED, issue, return_date=return_date)
+            fine_amount = refresh_issue_fine(issue)
+            if fine_amount > 0:
+                fines.append(record_fine(issue, fine_amount))
+    return returned, fines
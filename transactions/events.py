@@ -0,0 +1,29 @@
+"""Writing the circulation event log.
+
+Every circulation action appends a ``CirculationEvent`` inside the transaction
+that performs it, so the log holds exactly the committed actions in commit
+order per issue. Derived tables are built from the log by
+``analytics.projections``.
+"""
+from django.db import transaction
+
+from .models import CirculationEvent
+from .signals import circulation_event_recorded
+
+
+def record_event(kind, issue=None, user_id=None, book_id=None, **data):
+    """Append an event for ``issue`` (or for the given user/book) and announce it.
+
+    Must be called inside the transaction that performs the action.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError('Circulation events must be recorded inside the action\'s transaction')
+    event = CirculationEvent.objects.create(
+        kind=kind,
+        issue_id=issue.pk if issue is not None else None,
+        user_id=user_id if user_id is not None else getattr(issue, 'user_id', None),
+        book_id=book_id if book_id is not None else getattr(issue, 'book_id', None),
+        data=data,
+    )
+    circulation_event_recorded.send(sender=CirculationEvent, event=event)
+    return event
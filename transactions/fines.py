@@ -0,0 +1,83 @@
+"""Stored fine accrual.
+
+``BookIssue.fine_accrued`` holds the overdue fine as of ``fine_accrued_on``.
+Open issues are brought up to date by the daily ``accrue_fines`` job, which
+issues one UPDATE per batch of distinct due dates (every issue sharing a due
+date owes the same amount). Returns and due-date extensions refresh the single
+issue involved. Reads (serializers, dashboard, reports) use the stored values.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, Value, When
+from django.utils import timezone
+
+from .events import record_event
+from .models import BookIssue, CirculationEvent, Fine, fine_between, fine_per_day
+
+DUE_DATE_BATCH_SIZE = 500
+
+
+def refresh_issue_fine(issue, as_of=None):
+    """Recompute and store one issue's fine (after a return or a due-date change)."""
+    as_of = issue.return_date or as_of or date.today()
+    issue.fine_accrued = fine_between(issue.due_date, as_of)
+    issue.fine_accrued_on = as_of
+    BookIssue.objects.filter(pk=issue.pk).update(
+        fine_accrued=issue.fine_accrued, fine_accrued_on=as_of, updated_at=timezone.now())
+    return issue.fine_accrued
+
+
+def record_fine(issue, amount):
+    """Create or update the issue's unpaid ``Fine`` and log the change. Returns the fine."""
+    previous = Fine.objects.filter(issue=issue).values_list('amount', flat=True).first() or Decimal('0')
+    fine, _ = Fine.objects.update_or_create(issue=issue, defaults={'amount': amount, 'paid': False})
+    if amount != previous:
+        record_event(CirculationEvent.KIND_FINED, issue, fine_id=fine.pk, amount=amount, previous=previous)
+    return fine
+
+
+def accrue_fines(today=None):
+    """Bring the stored fine of every open issue up to ``today``. Returns the rows updated."""
+    today = today or date.today()
+    rate = fine_per_day()
+    open_issues = BookIssue.objects.filter(status=BookIssue.STATUS_ISSUED)
+
+    # Issues that are not (or no longer) overdue owe nothing.
+    updated = open_issues.exclude(due_date__lt=today).exclude(fine_accrued=0).update(
+        fine_accrued=Decimal('0'), fine_accrued_on=today)
+
+    due_dates = list(
+        open_issues.filter(due_date__lt=today).values_list('due_date', flat=True).distinct().order_by('due_date')
+    )
+    for start in range(0, len(due_dates), DUE_DATE_BATCH_SIZE):
+        batch = due_dates[start:start + DUE_DATE_BATCH_SIZE]
+        amount = Case(
+            *[When(due_date=due_date, then=Value(fine_between(due_date, today, rate))) for due_date in batch],
+            output_field=DecimalField(max_digits=8, decimal_places=2),
+        )
+        updated += open_issues.filter(due_date__in=batch).update(fine_accrued=amount, fine_accrued_on=today)
+    return updated
+
+
+def reconcile_fines(today=None, fix=False):
+    """Compare stored fines with the formula; returns ``[(issue_id, stored, expected)]`` mismatches.
+
+    Open issues are checked as of ``today``, returned ones as of their return date.
+    With ``fix=True`` the mismatching rows are corrected.
+    """
+    today = today or date.today()
+    rate = fine_per_day()
+    issues = BookIssue.objects.filter(
+        status__in=(BookIssue.STATUS_ISSUED, BookIssue.STATUS_RETURNED)
+    ).values_list('id', 'status', 'due_date', 'return_date', 'fine_accrued')
+
+    mismatches = []
+    for issue_id, status, due_date, return_date, stored in issues.iterator(chunk_size=5000):
+        as_of = return_date if status == BookIssue.STATUS_RETURNED and return_date else today
+        expected = fine_between(due_date, as_of, rate)
+        if stored != expected:
+            mismatches.append((issue_id, stored, expected))
+            if fix:
+                BookIssue.objects.filter(pk=issue_id).update(fine_accrued=expected, fine_accrued_on=as_of)
+    return mismatches
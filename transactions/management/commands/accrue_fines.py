@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from transactions.fines import accrue_fines, reconcile_fines
+
+
+class Command(BaseCommand):
+    help = 'Bring the stored fines of open issues up to date (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reconcile', action='store_true',
+                            help='Compare stored fines with the fine formula instead of accruing')
+        parser.add_argument('--fix', action='store_true', help='With --reconcile, correct mismatching fines')
+
+    def handle(self, *args, **options):
+        if not options['reconcile']:
+            updated = accrue_fines()
+            self.stdout.write(self.style.SUCCESS(f'Accrued fines on {updated} issues'))
+            return
+
+        mismatches = reconcile_fines(fix=options['fix'])
+        for issue_id, stored, expected in mismatches[:50]:
+            self.stdout.write(f'Issue {issue_id}: stored {stored}, expected {expected}')
+        if len(mismatches) > 50:
+            self.stdout.write(f'... and {len(mismatches) - 50} more')
+        verb = 'Fixed' if options['fix'] else 'Found'
+        style = self.style.SUCCESS if options['fix'] or not mismatches else self.style.WARNING
+        self.stdout.write(style(f'{verb} {len(mismatches)} mismatched fines'))
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.archive import ARCHIVE_BATCH_SIZE, archivable_issues, archive_issues
+
+
+class Command(BaseCommand):
+    help = 'Move old returned/rejected issues to the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.ISSUE_ARCHIVE_AFTER_DAYS,
+                            help='Archive closed issues untouched for this many days')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Issues per batch/transaction')
+        parser.add_argument('--limit', type=int, help='Archive at most this many issues')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the archivable issues')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        days = options['older_than_days']
+        if options['dry_run']:
+            self.stdout.write(f'{archivable_issues(days).count()} issues can be archived')
+            return
+
+        archived = archive_issues(
+            older_than_days=days, batch_size=options['batch_size'], limit=options['limit'],
+            progress=lambda total: self.stdout.write(f'Archived {total} issues...'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} issues'))
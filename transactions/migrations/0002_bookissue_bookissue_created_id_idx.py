@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['created_at', 'id'], name='bookissue_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:27
+
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_fines(apps, schema_editor):
+    BookIssue = apps.get_model('transactions', 'BookIssue')
+    Setting = apps.get_model('system_settings', 'Setting')
+    setting = Setting.objects.filter(key='fine_per_day').values_list('value', flat=True).first()
+    rate = Decimal(str(setting if setting is not None else settings.FINE_PER_DAY))
+    today = date.today()
+
+    batch = []
+    issues = BookIssue.objects.filter(status__in=['ISSUED', 'RETURNED'], due_date__isnull=False)
+    for issue in issues.only('id', 'status', 'due_date', 'return_date').iterator(chunk_size=2000):
+        as_of = issue.return_date if issue.status == 'RETURNED' and issue.return_date else today
+        days_over = (as_of - issue.due_date).days
+        issue.fine_accrued = Decimal(days_over) * rate if days_over > 0 else Decimal('0')
+        issue.fine_accrued_on = as_of
+        batch.append(issue)
+        if len(batch) >= 2000:
+            BookIssue.objects.bulk_update(batch, ['fine_accrued', 'fine_accrued_on'])
+            batch = []
+    if batch:
+        BookIssue.objects.bulk_update(batch, ['fine_accrued', 'fine_accrued_on'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_bookissue_bookissue_created_id_idx'),
+        ('system_settings', '0002_seed_settings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookissue',
+            name='fine_accrued',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name='bookissue',
+            name='fine_accrued_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_fines, migrations.RunPython.noop),
+    ]
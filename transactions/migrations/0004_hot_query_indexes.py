@@ -0,0 +1,29 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_bookissue_fine_accrued'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['status', 'due_date'], name='bookissue_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['user', 'status'], name='bookissue_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(condition=models.Q(('status', 'ISSUED')), fields=['due_date'], name='bookissue_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fine',
+            index=models.Index(fields=['paid', 'amount'], name='fine_paid_amount_idx'),
+        ),
+    ]
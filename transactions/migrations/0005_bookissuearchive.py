@@ -0,0 +1,48 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_catalogversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transactions', '0004_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fine',
+            name='issue',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fine', to='transactions.bookissue'),
+        ),
+        migrations.CreateModel(
+            name='BookIssueArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('REQUESTED', 'Requested'), ('ISSUED', 'Issued'), ('RETURNED', 'Returned'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('issue_date', models.DateField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('return_date', models.DateField(blank=True, null=True)),
+                ('fine_accrued', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('fine_accrued_on', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_issues', to='books.book')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_issues', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='fine',
+            name='archived_issue',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='fine', to='transactions.bookissuearchive'),
+        ),
+        migrations.AddIndex(
+            model_name='bookissuearchive',
+            index=models.Index(fields=['user', 'created_at'], name='issuearchive_user_created_idx'),
+        ),
+    ]
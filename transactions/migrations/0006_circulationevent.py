@@ -0,0 +1,77 @@
+# Generated by Django 4.2.28 on 2026-10-18 18:36
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+from datetime import datetime, time
+
+
+def backfill_events(apps, schema_editor):
+    """Synthesize the log for circulation that happened before it existed, in time order."""
+    BookIssue = apps.get_model('transactions', 'BookIssue')
+    BookIssueArchive = apps.get_model('transactions', 'BookIssueArchive')
+    Fine = apps.get_model('transactions', 'Fine')
+    CirculationEvent = apps.get_model('transactions', 'CirculationEvent')
+    tz = django.utils.timezone.get_current_timezone()
+
+    def at(day, fallback):
+        return datetime.combine(day, time.min, tzinfo=tz) if day else fallback
+
+    events = []
+    fields = ('id', 'user_id', 'book_id', 'status', 'issue_date', 'due_date', 'return_date', 'created_at', 'updated_at')
+    for model in (BookIssue, BookIssueArchive):
+        for issue in model.objects.values(*fields).iterator(chunk_size=5000):
+            ids = {'issue_id': issue['id'], 'user_id': issue['user_id'], 'book_id': issue['book_id']}
+            events.append((issue['created_at'], 'REQUESTED', ids, {}))
+            if issue['status'] in ('ISSUED', 'RETURNED'):
+                events.append((at(issue['issue_date'], issue['created_at']), 'ISSUED', ids,
+                               {'issue_date': issue['issue_date'], 'due_date': issue['due_date']}))
+            if issue['status'] == 'RETURNED':
+                events.append((at(issue['return_date'], issue['updated_at']), 'RETURNED', ids,
+                               {'return_date': issue['return_date']}))
+            elif issue['status'] == 'REJECTED':
+                events.append((issue['updated_at'], 'REJECTED', ids, {}))
+
+    loans = {}
+    for model in (BookIssue, BookIssueArchive):
+        loans.update({row['id']: row for row in model.objects.values('id', 'user_id', 'book_id').iterator(chunk_size=5000)})
+    for fine in Fine.objects.values('id', 'issue_id', 'archived_issue_id', 'amount', 'paid', 'created_at').iterator():
+        loan = loans.get(fine['issue_id'] or fine['archived_issue_id'], {})
+        ids = {'issue_id': loan.get('id'), 'user_id': loan.get('user_id'), 'book_id': loan.get('book_id')}
+        events.append((fine['created_at'], 'FINED', ids, {'fine_id': fine['id'], 'amount': fine['amount'], 'previous': 0}))
+        if fine['paid']:
+            events.append((fine['created_at'], 'PAID', ids, {'fine_id': fine['id'], 'amount': fine['amount']}))
+
+    order = {'REQUESTED': 0, 'ISSUED': 1, 'RETURNED': 2, 'REJECTED': 2, 'FINED': 3, 'PAID': 4}
+    events.sort(key=lambda event: (event[0], order[event[1]]))
+    CirculationEvent.objects.bulk_create(
+        [CirculationEvent(kind=kind, created_at=created_at, data=data, **ids) for created_at, kind, ids, data in events],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_bookissuearchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CirculationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('REQUESTED', 'Requested'), ('ISSUED', 'Issued'), ('REJECTED', 'Rejected'), ('RETURNED', 'Returned'), ('EXTENDED', 'Extended'), ('FINED', 'Fined'), ('PAID', 'Fine paid')], max_length=20)),
+                ('issue_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('book_id', models.BigIntegerField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['issue_id', 'id'], name='circevent_issue_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
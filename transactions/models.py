@@ -3,12 +3,28 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 from books.models import Book
 from system_settings.utils import get_setting_value
 
 
+def fine_per_day() -> Decimal:
+    return Decimal(str(get_setting_value('fine_per_day', default=settings.FINE_PER_DAY)))
+
+
+def fine_between(due_date, end_date, rate=None) -> Decimal:
+    """The fine for an item due on ``due_date`` and returned (or still out) on ``end_date``."""
+    if not due_date:
+        return Decimal('0')
+    days_over = (end_date - due_date).days
+    if days_over <= 0:
+        return Decimal('0')
+    return Decimal(days_over) * (fine_per_day() if rate is None else rate)
+
+
 class BookIssue(models.Model):
     STATUS_REQUESTED = 'REQUESTED'
     STATUS_ISSUED = 'ISSUED'
@@ -28,9 +44,21 @@ class BookIssue(models.Model):
     issue_date = models.DateField(blank=True, null=True)
     due_date = models.DateField(blank=True, null=True)
     return_date = models.DateField(blank=True, null=True)
+    # Overdue fine as of fine_accrued_on, maintained by transactions.fines.
+    fine_accrued = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    fine_accrued_on = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='bookissue_created_id_idx'),
+            models.Index(fields=['status', 'due_date'], name='bookissue_status_due_idx'),
+            models.Index(fields=['user', 'status'], name='bookissue_user_status_idx'),
+            # Overdue scans, due warnings and fine accrual only look at open issues.
+            models.Index(fields=['due_date'], condition=models.Q(status='ISSUED'), name='bookissue_open_due_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"{self.book.title} - {self.user.username} ({self.status})"
 
@@ -39,21 +67,101 @@ class BookIssue(models.Model):
         return self.status == self.STATUS_ISSUED and self.due_date and date.today() > self.due_date
 
     def compute_fine(self) -> Decimal:
-        if not self.due_date:
-            return Decimal('0')
-        end_date = self.return_date or date.today()
-        days_over = (end_date - self.due_date).days
-        if days_over > 0:
-            fine_per_day = Decimal(str(get_setting_value('fine_per_day', default=settings.FINE_PER_DAY)))
-            return Decimal(days_over) * fine_per_day
-        return Decimal('0')
+        """The fine from the formula, as of today for open issues (see ``fine_accrued`` for the stored value)."""
+        return fine_between(self.due_date, self.return_date or date.today())
+
+
+class BookIssueArchive(models.Model):
+    """A closed issue moved out of ``BookIssue`` by ``transactions.archive``.
+
+    Keeps the original id and columns, so archived rows render like live ones.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_issues')
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='archived_issues')
+    status = models.CharField(max_length=20, choices=BookIssue.STATUS_CHOICES)
+    issue_date = models.DateField(blank=True, null=True)
+    due_date = models.DateField(blank=True, null=True)
+    return_date = models.DateField(blank=True, null=True)
+    fine_accrued = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    fine_accrued_on = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='issuearchive_user_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.book.title} - {self.user.username} ({self.status}, archived)"
+
+    @property
+    def is_overdue(self) -> bool:
+        return False
 
 
 class Fine(models.Model):
-    issue = models.OneToOneField(BookIssue, on_delete=models.CASCADE, related_name='fine')
+    # Moves from ``issue`` to ``archived_issue`` when the issue is archived.
+    issue = models.OneToOneField(BookIssue, on_delete=models.SET_NULL, null=True, blank=True, related_name='fine')
+    archived_issue = models.OneToOneField(
+        BookIssueArchive, on_delete=models.SET_NULL, null=True, blank=True, related_name='fine'
+    )
     amount = models.DecimalField(max_digits=8, decimal_places=2, default=0)
     paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['paid', 'amount'], name='fine_paid_amount_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Fine {self.amount} for {self.loan}"
+
+    @property
+    def loan(self):
+        """The live or archived issue this fine belongs to."""
+        return self.issue if self.issue_id else self.archived_issue
+
+
+class CirculationEvent(models.Model):
+    """Append-only log of circulation actions, written in the same transaction as the action.
+
+    Ids are kept as plain columns so the log survives archiving and deletes.
+    ``data`` holds the kind-specific details (due date, amount, ...).
+    """
+    KIND_REQUESTED = 'REQUESTED'
+    KIND_ISSUED = 'ISSUED'
+    KIND_REJECTED = 'REJECTED'
+    KIND_RETURNED = 'RETURNED'
+    KIND_EXTENDED = 'EXTENDED'
+    KIND_FINED = 'FINED'
+    KIND_PAID = 'PAID'
+
+    KIND_CHOICES = [
+        (KIND_REQUESTED, 'Requested'),
+        (KIND_ISSUED, 'Issued'),
+        (KIND_REJECTED, 'Rejected'),
+        (KIND_RETURNED, 'Returned'),
+        (KIND_EXTENDED, 'Extended'),
+        (KIND_FINED, 'Fined'),
+        (KIND_PAID, 'Fine paid'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    issue_id = models.BigIntegerField(blank=True, null=True)
+    user_id = models.BigIntegerField(blank=True, null=True)
+    book_id = models.BigIntegerField(blank=True, null=True)
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['issue_id', 'id'], name='circevent_issue_idx'),
+        ]
+
     def __str__(self) -> str:
-        return f"Fine {self.amount} for {self.issue}"
+        return f"{self.kind} issue={self.issue_id} ({self.created_at:%Y-%m-%d %H:%M})"
@@ -11,19 +11,75 @@ class BookIssueSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
     is_overdue = serializers.BooleanField(read_only=True)
-    fine_amount = serializers.DecimalField(source='compute_fine', max_digits=8, decimal_places=2, read_only=True)
+    fine_amount = serializers.DecimalField(source='fine_accrued', max_digits=8, decimal_places=2, read_only=True)
 
     class Meta:
         model = BookIssue
         fields = [
             'id', 'user', 'book', 'book_id', 'status', 'issue_date', 'due_date',
-            'return_date', 'created_at', 'updated_at', 'is_overdue', 'fine_amount'
+            'return_date', 'created_at', 'updated_at', 'is_overdue', 'fine_amount', 'fine_accrued_on'
         ]
         read_only_fields = ['status', 'issue_date', 'due_date', 'return_date']
 
 class FineSerializer(serializers.ModelSerializer):
-    issue = BookIssueSerializer(read_only=True)
+    # Archived issues have the same columns, so both render with the issue serializer.
+    issue = BookIssueSerializer(source='loan', read_only=True)
     
     class Meta:
         model = Fine
         fields = '__all__'
+
+
+class BookIssueListSerializer(serializers.ModelSerializer):
+    """Flat row for ``?compact=true`` issue lists; pair with ``issue_list_queryset``."""
+    book_title = serializers.CharField(source='book.title', read_only=True)
+    book_isbn = serializers.CharField(source='book.isbn', read_only=True)
+    author_name = serializers.CharField(source='book.author.name', read_only=True)
+    username = serializers.CharField(source='user.username', read_only=True)
+    is_overdue = serializers.BooleanField(read_only=True)
+    fine_amount = serializers.DecimalField(source='fine_accrued', max_digits=8, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = BookIssue
+        fields = [
+            'id', 'user_id', 'username', 'book_id', 'book_title', 'book_isbn', 'author_name', 'status',
+            'issue_date', 'due_date', 'return_date', 'created_at', 'is_overdue', 'fine_amount',
+        ]
+        read_only_fields = fields
+
+
+class FineListSerializer(serializers.ModelSerializer):
+    """Flat row for ``?compact=true`` fine lists; pair with ``fine_list_queryset``."""
+    book_id = serializers.IntegerField(source='loan.book_id', read_only=True)
+    book_title = serializers.CharField(source='loan.book.title', read_only=True)
+    user_id = serializers.IntegerField(source='loan.user_id', read_only=True)
+    username = serializers.CharField(source='loan.user.username', read_only=True)
+    due_date = serializers.DateField(source='loan.due_date', read_only=True)
+    return_date = serializers.DateField(source='loan.return_date', read_only=True)
+
+    class Meta:
+        model = Fine
+        fields = [
+            'id', 'issue_id', 'archived_issue_id', 'amount', 'paid', 'created_at',
+            'book_id', 'book_title', 'user_id', 'username', 'due_date', 'return_date',
+        ]
+        read_only_fields = fields
+
+
+def issue_list_queryset(queryset):
+    """Load the columns ``BookIssueListSerializer`` reads, joined in one query."""
+    return queryset.select_related('book__author', 'user').only(
+        'id', 'user_id', 'book_id', 'status', 'issue_date', 'due_date', 'return_date', 'created_at',
+        'fine_accrued', 'book__title', 'book__isbn', 'book__author__name', 'user__username',
+    )
+
+
+def fine_list_queryset(queryset):
+    """Load the columns ``FineListSerializer`` reads (from the live or archived issue), joined in one query."""
+    loan_columns = ['book_id', 'user_id', 'due_date', 'return_date', 'book__title', 'user__username']
+    return queryset.select_related(
+        'issue__book', 'issue__user', 'archived_issue__book', 'archived_issue__user'
+    ).only(
+        'id', 'issue_id', 'archived_issue_id', 'amount', 'paid', 'created_at',
+        *[f'{relation}__{column}' for relation in ('issue', 'archived_issue') for column in loan_columns],
+    )
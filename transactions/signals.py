@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent inside the approving transaction once an issue has moved to ISSUED.
+# Receivers get ``issue``.
+book_issued = Signal()
+
+# Sent by ``transactions.events.record_event`` inside the writing transaction.
+# Receivers get ``event``.
+circulation_event_recorded = Signal()
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from books.models import Author, Book
+
+from .archive import ARCHIVED_FIELDS, archivable_issues, archive_issues
+from .models import BookIssue, BookIssueArchive, Fine
+
+
+class ArchivableIssuesSQLTests(TestCase):
+    def test_locking_query_has_no_outer_join(self):
+        # PostgreSQL rejects FOR UPDATE on the nullable side of an outer join; compile
+        # the archiver's query for it without needing a server.
+        postgres = PostgresWrapper({**connection.settings_dict, 'ENGINE': 'django.db.backends.postgresql'})
+        queryset = (
+            archivable_issues(30).select_for_update(of=('self',))
+            .order_by('id').values(*ARCHIVED_FIELDS)[:10]
+        )
+        with mock.patch.object(postgres, 'get_autocommit', return_value=False):
+            sql, _ = queryset.query.get_compiler(connection=postgres).as_sql()
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('FOR UPDATE OF "transactions_bookissue"', sql)
+
+
+@skipUnless(connection.features.has_select_for_update, 'database does not support SELECT ... FOR UPDATE')
+class ArchiveIssuesTests(TransactionTestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='reader', password='x')
+        book = Book.objects.create(isbn='9780000000001', title='Archived', author=Author.objects.create(name='A'))
+        self.closed, self.unpaid, self.paid = (
+            BookIssue.objects.create(user=user, book=book, status=BookIssue.STATUS_RETURNED) for _ in range(3)
+        )
+        Fine.objects.create(issue=self.unpaid, amount=5, paid=False)
+        Fine.objects.create(issue=self.paid, amount=5, paid=True)
+        BookIssue.objects.update(updated_at=timezone.now() - timedelta(days=400))
+
+    def test_archives_closed_issues_without_unpaid_fines(self):
+        self.assertEqual(archive_issues(older_than_days=30, batch_size=1), 2)
+        self.assertQuerysetEqual(BookIssue.objects.all(), [self.unpaid.pk], transform=lambda issue: issue.pk)
+        self.assertEqual(set(BookIssueArchive.objects.values_list('id', flat=True)), {self.closed.pk, self.paid.pk})
+        self.assertEqual(Fine.objects.get(archived_issue_id=self.paid.pk).issue_id, None)
@@ -12,6 +12,8 @@ from books.models import Book
 from notifications.utils import notify_user
 from system_settings.utils import get_setting_value
 
+from . import circulation
+from .archive import issue_history
 from .forms import IssueRequestForm
 from .models import BookIssue, Fine
 
@@ -27,7 +29,7 @@ def request_issue(request, book_id=None):
             if existing_open:
                 messages.warning(request, 'You already have this book requested or issued.')
                 return redirect('books:list')
-            BookIssue.objects.create(user=request.user, book=book, status=BookIssue.STATUS_REQUESTED)
+            circulation.request_issue(request.user, book)
             messages.success(request, 'Issue request submitted.')
             return redirect('transactions:my-issues')
     else:
@@ -41,7 +43,7 @@ def request_issue(request, book_id=None):
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def my_issues(request):
-    issues = BookIssue.objects.filter(user=request.user).select_related('book').order_by('-created_at')
+    issues = issue_history(request.user)
     return render(request, 'student/issued_books.html', {'issues': issues})
 
 
@@ -61,20 +63,14 @@ def issued_books(request):
 @role_required(UserProfile.ROLE_ADMIN)
 @transaction.atomic
 def approve_issue(request, pk):
-    issue = get_object_or_404(BookIssue, pk=pk, status=BookIssue.STATUS_REQUESTED)
+    issue = get_object_or_404(BookIssue.objects.select_related('book'), pk=pk, status=BookIssue.STATUS_REQUESTED)
     book = issue.book
-    if not book.is_available:
-        messages.error(request, 'Book not available.')
-        return redirect('transactions:issue-requests')
-
-    issue.status = BookIssue.STATUS_ISSUED
-    issue.issue_date = date.today()
     issue_days = int(get_setting_value('max_issue_days', default=settings.ISSUE_DURATION_DAYS))
-    issue.due_date = date.today() + timedelta(days=issue_days)
-    issue.save()
-
-    book.available_count = max(book.available_count - 1, 0)
-    book.save()
+    try:
+        circulation.approve_issue(issue, date.today() + timedelta(days=issue_days))
+    except circulation.CirculationError as exc:
+        messages.error(request, f'{exc}.')
+        return redirect('transactions:issue-requests')
 
     messages.success(request, 'Issue approved.')
     notify_user(issue.user, f"Your request for '{book.title}' was approved.", category='issue')
@@ -86,8 +82,11 @@ def approve_issue(request, pk):
 @transaction.atomic
 def reject_issue(request, pk):
     issue = get_object_or_404(BookIssue, pk=pk, status=BookIssue.STATUS_REQUESTED)
-    issue.status = BookIssue.STATUS_REJECTED
-    issue.save()
+    try:
+        circulation.reject_issue(issue)
+    except circulation.CirculationError as exc:
+        messages.error(request, f'{exc}.')
+        return redirect('transactions:issue-requests')
     messages.info(request, 'Issue rejected.')
     notify_user(issue.user, f"Your request for '{issue.book.title}' was rejected.", category='issue')
     return redirect('transactions:issue-requests')
@@ -97,18 +96,13 @@ def reject_issue(request, pk):
 @role_required(UserProfile.ROLE_ADMIN)
 @transaction.atomic
 def mark_returned(request, pk):
-    issue = get_object_or_404(BookIssue, pk=pk, status=BookIssue.STATUS_ISSUED)
-    issue.status = BookIssue.STATUS_RETURNED
-    issue.return_date = date.today()
-    issue.save()
-
+    issue = get_object_or_404(BookIssue.objects.select_related('book'), pk=pk, status=BookIssue.STATUS_ISSUED)
     book = issue.book
-    book.available_count = min(book.available_count + 1, book.quantity)
-    book.save()
-
-    fine_amount = issue.compute_fine()
-    if fine_amount > 0:
-        Fine.objects.update_or_create(issue=issue, defaults={'amount': fine_amount, 'paid': False})
+    try:
+        circulation.return_issue(issue)
+    except circulation.CirculationError as exc:
+        messages.error(request, f'{exc}.')
+        return redirect('transactions:issue-requests')
     messages.success(request, 'Book marked as returned.')
     notify_user(issue.user, f"'{book.title}' was marked as returned.", category='issue')
     return redirect('transactions:issue-requests')
@@ -117,7 +111,7 @@ def mark_returned(request, pk):
 @login_required
 @role_required(UserProfile.ROLE_STUDENT)
 def fines_view(request):
-    issues = BookIssue.objects.filter(user=request.user).select_related('book', 'fine').order_by('-created_at')
+    issues = issue_history(request.user)
     return render(request, 'student/fines.html', {'issues': issues})
 
 